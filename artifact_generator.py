@@ -1,8 +1,21 @@
+from __future__ import annotations
+import hashlib
 import json
+import os
+import pickle
 import random
-from copy import deepcopy
-from dataclasses import dataclass, field
-from datatypes import Artifact, ArtifactType, Domain, Set, MainStat, SubStat
+import sys
+from dataclasses import dataclass, field, replace
+from numbers import Integral
+from typing import TYPE_CHECKING, Iterator, Union
+from datatypes import Artifact, ArtifactType, CompactArtifact, Domain, Set, MainStat, SubStat
+from files import atomic_write
+from samplers import NumpyRandom, SubStatTables
+from stat_tables import MainStatTable
+
+if TYPE_CHECKING:
+    import numpy as np
+    from batch import ArtifactBatch
 
 DOMAINS = ['Domain of Guyun',
            'Midsummer Courtyard',
@@ -22,6 +35,40 @@ ARTIFACT_TYPE_NAMES = [
     'Circlet of Logos'
 ]
 
+MAIN_STAT_NAMES = [
+    'HP',
+    'ATK',
+    'HP (%)',
+    'ATK (%)',
+    'DEF (%)',
+    'Elemental Mastery',
+    'Energy Recharge (%)',
+    'Elemental DMG Bonus (%)',
+    'Physical DMG Bonus (%)',
+    'CRIT Rate (%)',
+    'CRIT DMG (%)',
+    'Healing Bonus (%)'
+]
+
+SUB_STAT_NAMES = [
+    'HP',
+    'ATK',
+    'DEF',
+    'HP (%)',
+    'ATK (%)',
+    'DEF (%)',
+    'Elemental Mastery',
+    'Energy Recharge (%)',
+    'CRIT Rate (%)',
+    'CRIT DMG (%)'
+]
+
+GRAND_ROLL_RARITIES = [
+    (5, [1, 2], [0.93, 0.07]),
+    (4, [2, 3], [0.52, 0.48]),
+    (3, [3, 4], [0.45, 0.55])
+]
+
 SUB_STATS_RANGES = [
     [0, 0],
     [0, 1],
@@ -30,75 +77,396 @@ SUB_STATS_RANGES = [
     [3, 4]
 ]
 
+DATA_DIR = 'data'
+DATA_FILES = ['main_stats.json', 'sub_stats.json', 'sets_from_domains.json']
+DATA_CACHE_FILE = '.generator_cache.pickle'
+DATA_CACHE_VERSION = 3
+MAX_RARITY = 5
+
+
+@dataclass
+class GeneratorData:
+    """Parsed data files, artifact types and domains are built from them when first needed."""
+    main_stats: dict
+    sub_stats: dict
+    sets: list[Set]
+
 
 @dataclass
 class ArtifactGenerator:
-    _rarities: list[list[ArtifactType]] = field(default_factory=list)
-    _domains: list[Domain] = field(default_factory=list)
+    """Rolls artifacts from the data files, building each rarity's artifact types and each domain on first use."""
+    data_dir: str = DATA_DIR
+    use_cache: bool = True
+    rng: random.Random = field(default=random, repr=False, compare=False)
+    _data: GeneratorData = field(default=None, init=False, repr=False)
+    _artifact_types: dict[int, list[ArtifactType]] = field(default_factory=dict, init=False, repr=False)
+    _domains: dict[int, Domain] = field(default_factory=dict, init=False, repr=False)
+    _set_ids: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _batch_tables: dict[str, np.ndarray] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
-        for i in range(5):
-            main_stats = get_artifact_main_stats(str(i + 1))
-            sub_stats = get_artifact_sub_stats(str(i + 1))
-            rarity_stats = [ArtifactType(ARTIFACT_TYPE_NAMES[j], main_stats[j], sub_stats) for j in range(5)]
-            self._rarities.append(rarity_stats)
-        self._domains = get_domains()
-
-    def grand_roll(self, domain_name: str):
-        domain = self.__find_domain(domain_name)
-        artifact_rarities = [*[5] * random.choices([1, 2], [0.93, 0.07], k=1)[0],
-                             *[4] * random.choices([2, 3], [0.52, 0.48], k=1)[0],
-                             *[3] * random.choices([3, 4], [0.45, 0.55], k=1)[0]]
+        numpy = sys.modules.get('numpy')
+        if numpy is not None and isinstance(self.rng, numpy.random.Generator):
+            self.rng = NumpyRandom(self.rng)
+        self._data = load_generator_data(self.data_dir, self.use_cache)
+        self._set_ids = {artifact_set.name: i for i, artifact_set in enumerate(self._data.sets)}
+
+    @property
+    def sets(self) -> list[Set]:
+        return self._data.sets
+
+    @property
+    def domains(self) -> list[Domain]:
+        return [self.get_domain(i) for i in range(len(DOMAINS))]
+
+    @property
+    def artifact_types(self) -> list[list[ArtifactType]]:
+        """Artifact types indexed by [rarity - 1][ARTIFACT_TYPE_NAMES index]."""
+        return [self.get_artifact_types(rarity) for rarity in range(1, MAX_RARITY + 1)]
+
+    def preload(self) -> 'ArtifactGenerator':
+        """Build every artifact type, domain and sub stat table now, so threads sharing the generator only read it."""
+        for artifact_types in self.artifact_types:
+            for artifact_type in artifact_types:
+                artifact_type.sub_stat_tables.build_all()
+        self.domains
+        return self
+
+    def get_artifact_types(self, rarity: int) -> list[ArtifactType]:
+        """Artifact types of a rarity indexed by ARTIFACT_TYPE_NAMES index."""
+        artifact_types = self._artifact_types.get(rarity)
+        if artifact_types is None:
+            artifact_types = build_artifact_types(self._data.main_stats, self._data.sub_stats, rarity)
+            self._artifact_types[rarity] = artifact_types
+        return artifact_types
+
+    def get_domain(self, domain: Union[str, int]) -> Domain:
+        """Domain by name or by id (its index in DOMAINS)."""
+        domain_id = get_domain_id(domain)
+        artifact_domain = self._domains.get(domain_id)
+        if artifact_domain is None:
+            artifact_domain = self._domains[domain_id] = build_domain(self._data.sets, domain_id)
+        return artifact_domain
+
+    def get_set_id(self, artifact_set: Set) -> int:
+        return self._set_ids[artifact_set.name]
+
+    @property
+    def main_stat_values(self) -> np.ndarray:
+        """Main stat values indexed by [rarity - 1, MAIN_STAT_NAMES index, level]."""
+        return self.__get_batch_tables()['main_values']
+
+    @property
+    def sub_stat_values(self) -> np.ndarray:
+        """Sub stat possible values indexed by [rarity - 1, SUB_STAT_NAMES index, tier], NaN past the last tier."""
+        return self.__get_batch_tables()['sub_values']
+
+    def grand_roll(self, domain_name: Union[str, int], rng: random.Random = None):
+        rng = self.rng if rng is None else rng
+        domain = self.get_domain(domain_name)
+        artifact_rarities = []
+        for rarity, counts, weights in GRAND_ROLL_RARITIES:
+            artifact_rarities.extend([rarity] * rng.choices(counts, weights, k=1)[0])
         artifacts = []
         for rarity in artifact_rarities:
-            artifact = self.roll(domain, rarity)
+            artifact = self.roll(domain, rarity, rng)
             artifacts.append(artifact)
         return artifacts
 
-    def roll(self, domain: Domain, rarity: int):
-        artifact_set = random.choice(domain.get_suitable_sets(rarity))
-        artifact_rarity = deepcopy(self._rarities[rarity - 1])
-        artifact_type_index = random.randint(0, 4)
-        artifact_type = artifact_rarity[artifact_type_index]
+    def roll(self, domain: Domain, rarity: int, rng: random.Random = None):
+        rng = self.rng if rng is None else rng
+        artifact_set = rng.choice(domain.get_suitable_sets(rarity))
+        artifact_type_index = rng.randint(0, 4)
+        artifact_type = self.get_artifact_types(rarity)[artifact_type_index]
+        main_stat = artifact_type.get_random_main_stat(rng)
+        number_of_sub_stats = rng.choice(SUB_STATS_RANGES[rarity - 1])
 
         artifact = Artifact(name=artifact_set.artifact_names[artifact_type_index],
                             type=artifact_type,
                             rarity=rarity,
-                            main_stat=artifact_type.get_random_main_stat(),
-                            sub_stats=artifact_type.get_random_sub_stats(random.choice(SUB_STATS_RANGES[rarity - 1])),
+                            main_stat=main_stat,
+                            sub_stats=artifact_type.get_random_sub_stats(number_of_sub_stats, main_stat.name, rng=rng),
                             set=artifact_set)
         return artifact
 
-    def __find_domain(self, domain_name: str) -> Domain:
-        for domain in self._domains:
-            if domain.name == domain_name:
-                return domain
-        raise ValueError(f'Domain \'{domain_name}\' not found.')
+    def grand_roll_batch(self, domain_name: Union[str, int], n_runs: int,
+                         seed: Union[int, np.random.Generator] = None) -> ArtifactBatch:
+        """Vectorized grand_roll for n_runs domain runs, artifacts are ordered by run.
+
+        seed is anything np.random.default_rng accepts, including a Generator to keep drawing from.
+        """
+        import numpy as np
+        from batch import ArtifactBatch, choose_weighted, sample_without_replacement
+        domain = self.get_domain(domain_name)
+        tables = self.__get_batch_tables()
+        rng = np.random.default_rng(seed)
 
+        rarities = np.array([rarity for rarity, _, _ in GRAND_ROLL_RARITIES])
+        counts = np.empty((n_runs, len(GRAND_ROLL_RARITIES)), dtype=np.int64)
+        for i, (_, rarity_counts, weights) in enumerate(GRAND_ROLL_RARITIES):
+            counts[:, i] = np.take(rarity_counts, choose_weighted(rng, weights, n_runs))
+        run = np.repeat(np.arange(n_runs), counts.sum(axis=1))
+        rarity = np.repeat(np.tile(rarities, n_runs), counts.ravel()).astype(np.uint8)
+        size = len(rarity)
 
-def get_domains() -> list[Domain]:
-    with open('data/sets_from_domains.json', 'r') as file:
-        sets = json.load(file)
+        artifact_set = np.empty(size, dtype=np.int16)
+        for r in rarities:
+            mask = rarity == r
+            set_ids = np.array([self.get_set_id(s) for s in domain.get_suitable_sets(r)])
+            artifact_set[mask] = set_ids[rng.integers(len(set_ids), size=mask.sum())]
 
-    domains = []
-    for i, domain in enumerate(DOMAINS):
-        domains.append(Domain(domain))
-        for j in sets.keys():
-            if domain in sets[j]['obtain_locations'][sets[j]['rarities'][0]]:
-                domain_set = Set(name=sets[j]['name'],
-                                 artifact_names=sets[j]['artifact_names'],
-                                 artifact_images=sets[j]['artifact_images'],
-                                 bonuses=sets[j]['bonuses'],
-                                 rarities=sets[j]['rarities'],
-                                 obtain_locations=sets[j]['obtain_locations'])
-                domains[i].sets.append(domain_set)
-    return domains
+        artifact_type = rng.integers(len(ARTIFACT_TYPE_NAMES), size=size).astype(np.uint8)
+        main_stat = np.empty(size, dtype=np.uint8)
+        for r in rarities:
+            for t in range(len(ARTIFACT_TYPE_NAMES)):
+                mask = (rarity == r) & (artifact_type == t)
+                main_stat[mask] = choose_weighted(rng, tables['main_weights'][r - 1, t], mask.sum())
 
+        sub_ranges = tables['sub_ranges'][rarity - 1]
+        sub_count = rng.integers(sub_ranges[:, 0], sub_ranges[:, 1] + 1)
+        sub_weights = tables['sub_weights'][rarity - 1]
+        excluded = tables['main_to_sub'][main_stat]
+        sub_weights[excluded >= 0, excluded[excluded >= 0]] = 0.0
+        sub_stats = sample_without_replacement(rng, sub_weights, 4).astype(np.int8)
+        sub_stats[np.arange(4) >= sub_count[:, None]] = -1
+
+        present = sub_stats >= 0
+        n_tiers = tables['sub_tiers'][rarity[:, None] - 1, np.maximum(sub_stats, 0)]
+        tier = (rng.random(sub_stats.shape) * n_tiers).astype(np.intp)
+        sub_tiers = np.zeros((size, 4, tables['sub_values'].shape[-1]), dtype=np.uint8)
+        rows, slots = np.nonzero(present)
+        sub_tiers[rows, slots, tier[present]] = 1
+
+        return ArtifactBatch(run=run,
+                             domain=np.full(size, domain.id, dtype=np.uint8),
+                             rarity=rarity,
+                             set=artifact_set,
+                             type=artifact_type,
+                             main_stat=main_stat,
+                             sub_stats=sub_stats,
+                             sub_tiers=sub_tiers,
+                             level=np.zeros(size, dtype=np.uint8))
+
+    def stream(self, domain_name: Union[str, int], seed: Union[int, np.random.Generator] = None,
+               chunk_size: int = 10000, n_runs: int = None) -> Iterator[ArtifactBatch]:
+        """Lazily yields grand_roll_batch chunks of chunk_size runs, endlessly unless n_runs is given.
+
+        Nothing is rolled until the consumer asks for the next chunk; run indices keep counting across chunks.
+        """
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        start = 0
+        while n_runs is None or start < n_runs:
+            size = chunk_size if n_runs is None else min(chunk_size, n_runs - start)
+            batch = self.grand_roll_batch(domain_name, size, rng)
+            batch.run += start
+            start += size
+            yield batch
+
+    def expand_batch(self, batch: ArtifactBatch) -> list[Artifact]:
+        """Artifacts of a batch, sub stat proc histories listed in possible value order."""
+        columns = zip(batch.set.tolist(), batch.type.tolist(), batch.rarity.tolist(), batch.level.tolist(),
+                      batch.main_stat.tolist(), batch.sub_stats.tolist(), batch.sub_tiers.tolist(),
+                      batch.sub_count.tolist())
+        artifacts = []
+        for artifact_set, artifact_type, rarity, level, main_stat, sub_stats, sub_tiers, sub_count in columns:
+            rolls = bytes(slot << 4 | tier
+                          for slot in range(sub_count)
+                          for tier, count in enumerate(sub_tiers[slot])
+                          for _ in range(count))
+            compact = CompactArtifact(set=artifact_set,
+                                      type=artifact_type,
+                                      rarity=rarity,
+                                      level=level,
+                                      main_stat=main_stat,
+                                      sub_stats=bytes(sub_stats[:sub_count]),
+                                      rolls=rolls)
+            artifacts.append(self.expand(compact))
+        return artifacts
 
-def get_artifact_main_stats(rarity: str) -> list[list[MainStat]]:
-    with open('data/main_stats.json', 'r') as file:
-        stats = json.load(file)
+    def upgrade_batch(self, batch: ArtifactBatch, level: Union[int, np.ndarray] = None,
+                      seed: Union[int, np.random.Generator] = None) -> ArtifactBatch:
+        """Vectorized Artifact.upgrade_to, to max level by default; returns an upgraded copy of batch."""
+        import numpy as np
+        from batch import sample_without_replacement
+        tables = self.__get_batch_tables()
+        rng = np.random.default_rng(seed)
+        rarity = batch.rarity.astype(np.int64)
+        target = rarity * 4 if level is None else np.minimum(level, rarity * 4)
+        target = np.maximum(target, batch.level)
+        events = target // 4 - batch.level // 4
+        sub_count = batch.sub_count
+        added = np.minimum(events, 4 - sub_count)
+        sub_stats = batch.sub_stats.copy()
+        sub_tiers = batch.sub_tiers.copy()
 
+        sub_weights = tables['sub_weights'][rarity - 1]
+        rows, slots = np.nonzero(sub_stats >= 0)
+        sub_weights[rows, sub_stats[rows, slots]] = 0.0
+        excluded = tables['main_to_sub'][batch.main_stat]
+        sub_weights[excluded >= 0, excluded[excluded >= 0]] = 0.0
+        new_stats = sample_without_replacement(rng, sub_weights, 4)
+        pick = np.arange(4) - sub_count[:, None]
+        new_slots = (pick >= 0) & (pick < added[:, None])
+        picked = np.take_along_axis(new_stats, np.clip(pick, 0, 3), axis=1)
+        sub_stats[new_slots] = picked[new_slots]
+
+        rows, slots = np.nonzero(new_slots)
+        n_tiers = tables['sub_tiers'][rarity[rows] - 1, sub_stats[rows, slots]]
+        tier = (rng.random(len(rows)) * n_tiers).astype(np.intp)
+        sub_tiers[rows, slots, tier] += 1
+
+        rows = np.repeat(np.arange(len(batch)), events - added)
+        slots = rng.integers(4, size=len(rows))
+        n_tiers = tables['sub_tiers'][rarity[rows] - 1, sub_stats[rows, slots]]
+        tier = (rng.random(len(rows)) * n_tiers).astype(np.intp)
+        np.add.at(sub_tiers, (rows, slots, tier), 1)
+
+        return replace(batch, sub_stats=sub_stats, sub_tiers=sub_tiers, level=target.astype(np.uint8))
+
+    def compact(self, artifact: Artifact) -> CompactArtifact:
+        rolls = bytes(slot << 4 | stat.possible_values.index(value)
+                      for slot, stat in enumerate(artifact.sub_stats)
+                      for value in stat.proc_history)
+        return CompactArtifact(set=self.get_set_id(artifact.set),
+                               type=ARTIFACT_TYPE_NAMES.index(artifact.type.name),
+                               rarity=artifact.rarity,
+                               level=artifact.level,
+                               main_stat=MAIN_STAT_NAMES.index(artifact.main_stat.name),
+                               sub_stats=bytes(SUB_STAT_NAMES.index(stat.name) for stat in artifact.sub_stats),
+                               rolls=rolls)
+
+    def expand(self, artifact: CompactArtifact) -> Artifact:
+        artifact_set = self._data.sets[artifact.set]
+        artifact_type = self.get_artifact_types(artifact.rarity)[artifact.type]
+        main_stat_name = MAIN_STAT_NAMES[artifact.main_stat]
+        main_stat = next(stat for stat in artifact_type.main_stats if stat.name == main_stat_name)
+
+        sub_stat_templates = [next(stat for stat in artifact_type.sub_stats if stat.name == SUB_STAT_NAMES[stat_id])
+                              for stat_id in artifact.sub_stats]
+        proc_histories = [[] for _ in artifact.sub_stats]
+        for roll in artifact.rolls:
+            proc_histories[roll >> 4].append(sub_stat_templates[roll >> 4].possible_values[roll & 0xF])
+        sub_stats = [SubStat(stat.name, stat.possible_values, stat.probability, proc_history)
+                     for stat, proc_history in zip(sub_stat_templates, proc_histories)]
+
+        return Artifact(name=artifact_set.artifact_names[artifact.type],
+                        type=artifact_type,
+                        rarity=artifact.rarity,
+                        main_stat=replace(main_stat, level=artifact.level),
+                        sub_stats=sub_stats,
+                        set=artifact_set,
+                        level=artifact.level)
+
+    def __get_batch_tables(self) -> dict[str, np.ndarray]:
+        if self._batch_tables is None:
+            import numpy as np
+            rarities = self.artifact_types
+            max_tiers = max(len(stat.possible_values) for rarity in rarities for stat in rarity[0].sub_stats)
+            main_weights = np.zeros((len(rarities), len(ARTIFACT_TYPE_NAMES), len(MAIN_STAT_NAMES)))
+            sub_weights = np.zeros((len(rarities), len(SUB_STAT_NAMES)))
+            sub_tiers = np.zeros((len(rarities), len(SUB_STAT_NAMES)), dtype=np.int64)
+            sub_values = np.full((len(rarities), len(SUB_STAT_NAMES), max_tiers), np.nan)
+            for i, rarity in enumerate(rarities):
+                for j, artifact_type in enumerate(rarity):
+                    for stat in artifact_type.main_stats:
+                        main_weights[i, j, MAIN_STAT_NAMES.index(stat.name)] = stat.probability
+                for stat in rarity[0].sub_stats:
+                    k = SUB_STAT_NAMES.index(stat.name)
+                    sub_weights[i, k] = stat.probability
+                    sub_tiers[i, k] = len(stat.possible_values)
+                    sub_values[i, k, :len(stat.possible_values)] = stat.possible_values
+            main_to_sub = [SUB_STAT_NAMES.index(name) if name in SUB_STAT_NAMES else -1 for name in MAIN_STAT_NAMES]
+            self._batch_tables = {'main_weights': main_weights,
+                                  'sub_weights': sub_weights,
+                                  'sub_tiers': sub_tiers,
+                                  'sub_values': sub_values,
+                                  'main_values': MainStatTable.from_stats(self._data.main_stats).as_array(MAIN_STAT_NAMES),
+                                  'sub_ranges': np.array(SUB_STATS_RANGES),
+                                  'main_to_sub': np.array(main_to_sub)}
+        return self._batch_tables
+
+
+def get_domain_id(domain: Union[str, int]) -> int:
+    """Index of a domain in DOMAINS, by name or by id."""
+    if isinstance(domain, str) and domain in DOMAINS:
+        return DOMAINS.index(domain)
+    if isinstance(domain, Integral) and not isinstance(domain, bool) and 0 <= domain < len(DOMAINS):
+        return int(domain)
+    raise ValueError(f'Domain \'{domain}\' not found.')
+
+
+def load_generator_data(data_dir: str = DATA_DIR, use_cache: bool = True) -> GeneratorData:
+    """Parse every data file once, or reuse the pickled result while the files are unchanged."""
+    contents = []
+    for file_name in DATA_FILES:
+        with open(os.path.join(data_dir, file_name), 'rb') as file:
+            contents.append(file.read())
+    key = hashlib.sha256(b''.join(hashlib.sha256(content).digest() for content in contents)).hexdigest()
+    cache_path = os.path.join(data_dir, DATA_CACHE_FILE)
+
+    if use_cache:
+        data = read_data_cache(cache_path, key)
+        if data is not None:
+            return data
+
+    main_stats, sub_stats, sets = (json.loads(content) for content in contents)
+    data = GeneratorData(main_stats, sub_stats, get_sets(sets))
+
+    if use_cache:
+        write_data_cache(cache_path, key, data)
+    return data
+
+
+def read_data_cache(path: str, key: str):
+    try:
+        with open(path, 'rb') as file:
+            version, cached_key, data = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    if version != DATA_CACHE_VERSION or cached_key != key:
+        return None
+    return data
+
+
+def write_data_cache(path: str, key: str, data: GeneratorData):
+    """Concurrent workers never read a partial cache, and a read-only data directory just skips it."""
+    try:
+        with atomic_write(path, 'wb') as file:
+            pickle.dump((DATA_CACHE_VERSION, key, data), file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+
+def build_artifact_types(main_stats: dict, sub_stats: dict, rarity: int) -> list[ArtifactType]:
+    rarity_main_stats = get_artifact_main_stats(main_stats, str(rarity))
+    rarity_sub_stats = get_artifact_sub_stats(sub_stats, str(rarity))
+    sub_stat_tables = SubStatTables(rarity_sub_stats)
+    return [ArtifactType(ARTIFACT_TYPE_NAMES[i], rarity_main_stats[i], rarity_sub_stats, sub_stat_tables)
+            for i in range(len(ARTIFACT_TYPE_NAMES))]
+
+
+def get_sets(sets: dict) -> list[Set]:
+    domain_sets = []
+    for j in sets.keys():
+        domain_set = Set(name=sets[j]['name'],
+                         artifact_names=sets[j]['artifact_names'],
+                         artifact_images=sets[j]['artifact_images'],
+                         bonuses=sets[j]['bonuses'],
+                         rarities=sets[j]['rarities'],
+                         obtain_locations=sets[j]['obtain_locations'])
+        domain_sets.append(domain_set)
+    return domain_sets
+
+
+def build_domain(sets: list[Set], domain_id: int) -> Domain:
+    name = DOMAINS[domain_id]
+    domain_sets = [artifact_set for artifact_set in sets
+                   if name in artifact_set.obtain_locations[artifact_set.rarities[0]]]
+    return Domain(name, domain_sets, domain_id)
+
+
+def get_artifact_main_stats(stats: dict, rarity: str) -> list[list[MainStat]]:
     main_stats = []
     for i, artifact_type in enumerate(stats[rarity]):
         main_stats.append([])
@@ -111,10 +479,7 @@ def get_artifact_main_stats(rarity: str) -> list[list[MainStat]]:
     return main_stats
 
 
-def get_artifact_sub_stats(rarity: str) -> list[SubStat]:
-    with open('data/sub_stats.json', 'r') as file:
-        stats = json.load(file)
-
+def get_artifact_sub_stats(stats: dict, rarity: str) -> list[SubStat]:
     sub_stats = []
     for stat in stats[rarity]:
         sub_stat = SubStat(name=stat['name'],
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, fields
+import numpy as np
+
+
+@dataclass
+class ArtifactBatch:
+    """Artifacts as struct-of-arrays, one row per artifact.
+
+    domain, set, main_stat and sub_stats hold indices into DOMAINS, ArtifactGenerator sets,
+    MAIN_STAT_NAMES and SUB_STAT_NAMES, sub_tiers counts rolls of every possible value of
+    each sub stat.
+    """
+    run: np.ndarray
+    domain: np.ndarray
+    rarity: np.ndarray
+    set: np.ndarray
+    type: np.ndarray
+    main_stat: np.ndarray
+    sub_stats: np.ndarray
+    sub_tiers: np.ndarray
+    level: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.run)
+
+    @property
+    def sub_count(self) -> np.ndarray:
+        return (self.sub_stats >= 0).sum(axis=1)
+
+    def select(self, index) -> 'ArtifactBatch':
+        """Rows picked by a boolean mask, integer indices or a slice."""
+        return ArtifactBatch(**{column.name: getattr(self, column.name)[index] for column in fields(self)})
+
+    @classmethod
+    def concatenate(cls, batches: list['ArtifactBatch']) -> 'ArtifactBatch':
+        return cls(**{column.name: np.concatenate([getattr(batch, column.name) for batch in batches])
+                      for column in fields(cls)})
+
+
+def choose_weighted(rng: np.random.Generator, weights, size: int) -> np.ndarray:
+    """Vectorized random.choices: indices drawn with the given relative weights."""
+    cum_weights = np.cumsum(weights, dtype=float)
+    return np.searchsorted(cum_weights, rng.random(size) * cum_weights[-1], side='right')
+
+
+def sample_without_replacement(rng: np.random.Generator, weights: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise weighted sampling without replacement, in draw order.
+
+    Sorting exponential keys scaled by weights picks items exactly like drawing them
+    one by one proportionally to the weights of the items left (Efraimidis-Spirakis).
+    """
+    with np.errstate(divide='ignore'):
+        keys = rng.standard_exponential(weights.shape) / weights
+    return np.argsort(keys, axis=1, kind='stable')[:, :k]
@@ -0,0 +1,115 @@
+"""Load test of the session server with many concurrent simulated sessions.
+
+Run from the repository root, against an in-process server by default:
+    python -m bench.load_test --sessions 2000 --concurrency 500
+    python -m bench.load_test --host 127.0.0.1 --port 8765
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+from server import END_OF_RESPONSE, SessionServer
+from bench.run import BENCH_DATA_DIR
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, command: str) -> list[str]:
+    writer.write(f'{command}\n'.encode())
+    await writer.drain()
+    lines = []
+    while True:
+        line = (await reader.readline()).decode().rstrip('\n')
+        if line == END_OF_RESPONSE:
+            break
+        if not line and reader.at_eof():
+            raise ConnectionError('Server closed the connection.')
+        lines.append(line)
+    if lines[0] != 'OK':
+        raise RuntimeError(f'{command!r} failed: {lines[0]}')
+    return lines[1:]
+
+
+async def run_session(host: str, port: int, rng: random.Random, rolls: int,
+                      latencies: dict[str, list[float]]):
+    """A user choosing a domain, then rolling it, looking at, upgrading and checking the set of artifacts."""
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def timed(command: str) -> list[str]:
+        start = time.perf_counter()
+        lines = await request(reader, writer, command)
+        latencies[command.split()[0]].append(time.perf_counter() - start)
+        return lines
+
+    try:
+        artifacts = await timed(f'domain {rng.randint(1, 9)}')
+        for roll in range(rolls):
+            if roll:
+                artifacts = await timed('roll')
+            number = rng.randint(1, len(artifacts))
+            await timed(f'show {number}')
+            await timed(f'upgrade {number}')
+            await timed(f'upgrade {number} 20')
+            await timed(f'set {number}')
+        writer.write(b'quit\n')
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def load_test(host: str = None, port: int = None, sessions: int = 1000, concurrency: int = 200,
+                    rolls: int = 5, seed: int = 0) -> dict:
+    server = None
+    if host is None:
+        server = await SessionServer(port=0, data_dir=BENCH_DATA_DIR, seed=seed).start()
+        host, port = server.host, server.port
+
+    latencies = defaultdict(list)
+    limit = asyncio.Semaphore(concurrency)
+    rng = random.Random(seed)
+
+    async def limited(session_seed: int):
+        async with limit:
+            await run_session(host, port, random.Random(session_seed), rolls, latencies)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(limited(rng.getrandbits(64)) for _ in range(sessions)))
+    finally:
+        if server is not None:
+            await server.close()
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(values) for values in latencies.values())
+    return {'sessions': sessions,
+            'concurrency': concurrency,
+            'seconds': elapsed,
+            'requests': requests,
+            'requests_per_second': requests / elapsed,
+            'latency': {command: get_percentiles(values) for command, values in latencies.items()}}
+
+
+def get_percentiles(values: list[float]) -> dict[str, float]:
+    quantiles = statistics.quantiles(values, n=100) if len(values) > 1 else values * 99
+    return {'p50': quantiles[49], 'p90': quantiles[89], 'p99': quantiles[98], 'max': max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Session server load test.')
+    parser.add_argument('--host', help='server to test, an in-process one on bench data when omitted')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--rolls', type=int, default=5)
+    args = parser.parse_args()
+
+    result = asyncio.run(load_test(args.host, args.port, args.sessions, args.concurrency, args.rolls))
+    print(f'{result["sessions"]} sessions, {result["requests"]} requests in {result["seconds"]:.2f} s '
+          f'({result["requests_per_second"]:.0f} requests/s)')
+    print(f'{"command":<10} {"p50 ms":>10} {"p90 ms":>10} {"p99 ms":>10} {"max ms":>10}')
+    for command, latency in result['latency'].items():
+        print(f'{command:<10} ' + ' '.join(f'{latency[key] * 1e3:>10.2f}' for key in ('p50', 'p90', 'p99', 'max')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Benchmarks of the generator hot paths on the small offline data set in bench/data.
+
+Run from the repository root:
+    python -m bench.run --output results.json
+    python -m bench.run --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable
+import numpy as np
+from artifact_generator import ArtifactGenerator, DOMAINS
+from simulation import FarmingSimulation
+from stream import prefetch, upgrade_batches
+
+BENCH_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SEED = 12345
+DOMAIN = DOMAINS[0]
+
+
+@dataclass
+class Benchmark:
+    """run(setup()) is timed, number is how many operations one run does."""
+    name: str
+    run: Callable[[Any], Any]
+    number: int
+    setup: Callable[[], Any] = lambda: None
+
+
+@lru_cache(maxsize=None)
+def get_generator() -> ArtifactGenerator:
+    return ArtifactGenerator(BENCH_DATA_DIR, use_cache=False)
+
+
+def roll_artifacts(rarity: int, n: int) -> list:
+    generator = get_generator()
+    rng = random.Random(SEED)
+    domain = generator.get_domain(DOMAIN)
+    return [generator.roll(domain, rarity, rng) for _ in range(n)]
+
+
+def grand_roll(domain: str, n: int) -> Callable[[random.Random], None]:
+    def run(rng: random.Random):
+        generator = get_generator()
+        for _ in range(n):
+            generator.grand_roll(domain, rng)
+    return run
+
+
+def upgrade_to_max(artifacts: list):
+    rng = random.Random(SEED)
+    for artifact in artifacts:
+        artifact.upgrade_to_max(rng)
+
+
+def sample_sub_stats(rng: random.Random):
+    artifact_type = get_generator().artifact_types[4][4]
+    for _ in range(1000):
+        artifact_type.get_random_sub_stats(4, 'CRIT Rate (%)', rng=rng)
+
+
+def sample_main_stats(rng: random.Random):
+    artifact_type = get_generator().artifact_types[4][4]
+    for _ in range(1000):
+        artifact_type.get_random_main_stat(rng)
+
+
+def stream_upgraded(n_runs: int):
+    generator = get_generator()
+    batches = generator.stream(DOMAIN, SEED, chunk_size=n_runs // 4, n_runs=n_runs)
+    for _ in prefetch(upgrade_batches(batches, generator, seed=SEED)):
+        pass
+
+
+def get_benchmarks() -> list[Benchmark]:
+    benchmarks = [
+        Benchmark('generator_construction', lambda _: ArtifactGenerator(BENCH_DATA_DIR, use_cache=False), 1),
+        Benchmark('generator_construction_cached', lambda _: ArtifactGenerator(BENCH_DATA_DIR), 1),
+        Benchmark('first_grand_roll', lambda rng: ArtifactGenerator(BENCH_DATA_DIR).grand_roll(DOMAIN, rng), 1,
+                  lambda: random.Random(SEED)),
+    ]
+    benchmarks += [Benchmark(f'grand_roll[{domain}]', grand_roll(domain, 1000), 1000, lambda: random.Random(SEED))
+                   for domain in DOMAINS]
+    benchmarks += [
+        Benchmark('upgrade_to_max[5]', upgrade_to_max, 1000, lambda: roll_artifacts(5, 1000)),
+        Benchmark('upgrade_to_max[4]', upgrade_to_max, 1000, lambda: roll_artifacts(4, 1000)),
+        Benchmark('sub_stat_sampling', sample_sub_stats, 1000, lambda: random.Random(SEED)),
+        Benchmark('main_stat_sampling', sample_main_stats, 1000, lambda: random.Random(SEED)),
+        Benchmark('grand_roll_batch', lambda _: get_generator().grand_roll_batch(DOMAIN, 10000, SEED), 10000),
+        Benchmark('upgrade_batch', lambda batch: get_generator().upgrade_batch(batch, seed=SEED), 10000,
+                  lambda: get_generator().grand_roll_batch(DOMAIN, 10000, SEED)),
+        Benchmark('stream_upgrade_prefetch', lambda _: stream_upgraded(20000), 20000),
+        Benchmark('simulation[workers=1]',
+                  lambda _: FarmingSimulation(DOMAIN, 200, seed=SEED, data_dir=BENCH_DATA_DIR).run(), 200),
+        Benchmark('simulation[workers=2]',
+                  lambda _: FarmingSimulation(DOMAIN, 200, seed=SEED, workers=2, data_dir=BENCH_DATA_DIR).run(), 200),
+    ]
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict:
+    """Seconds per operation of every repeat, setup is not timed."""
+    timings = []
+    for _ in range(repeat):
+        state = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run(state)
+        timings.append((time.perf_counter() - start) / benchmark.number)
+    return {'number': benchmark.number,
+            'repeat': repeat,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+            'stdev': statistics.stdev(timings) if repeat > 1 else 0.0}
+
+
+def run_benchmarks(name_filter: str = '', repeat: int = 5) -> dict:
+    get_generator()
+    results = {}
+    for benchmark in get_benchmarks():
+        if name_filter in benchmark.name:
+            results[benchmark.name] = measure(benchmark, repeat)
+            print(f'{benchmark.name:<50} {results[benchmark.name]["median"] * 1e6:>12.2f} µs/op')
+    return {'metadata': {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                         'python': platform.python_version(),
+                         'numpy': np.__version__,
+                         'platform': platform.platform(),
+                         'seed': SEED},
+            'benchmarks': results}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints median ratios against baseline and returns the benchmarks slower by more than threshold."""
+    regressions = []
+    print(f'\n{"benchmark":<50} {"baseline":>12} {"current":>12} {"ratio":>8}')
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            continue
+        before, after = baseline['benchmarks'][name]['median'], result['median']
+        ratio = after / before
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  slower'
+        print(f'{name:<50} {before * 1e6:>12.2f} {after * 1e6:>12.2f} {ratio:>8.2f}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Artifact generator benchmarks.')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown ratio, 0.1 = 10%%')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}.')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field, replace
+from typing import Iterable, Optional
 import random
+from samplers import AliasTable, SubStatTables
+from stat_tables import get_main_stat_values
 
 
 @dataclass
@@ -12,21 +15,28 @@ class Set:
     obtain_locations: dict[int, list[str]]
 
     def print_info(self):
-        print(f'{self.name}:')
-        for piece in self.bonuses:
-            print(f'⊘ {piece}: {self.bonuses[piece]}')
+        print(self.format_info())
+
+    def format_info(self) -> str:
+        return '\n'.join([f'{self.name}:'] + [f'⊘ {piece}: {self.bonuses[piece]}' for piece in self.bonuses])
 
 
 @dataclass
 class Domain:
     name: str
     sets: list[Set] = field(default_factory=list)
+    id: int = None
+    sets_by_rarity: dict[int, tuple[Set, ...]] = field(init=False, repr=False, compare=False)
 
-    def get_suitable_sets(self, rarity: int) -> list[Set]:
-        suitable_sets = []
+    def __post_init__(self):
+        sets_by_rarity = {}
         for artifact_set in self.sets:
-            if str(rarity) in artifact_set.rarities:
-                suitable_sets.append(artifact_set)
+            for rarity in artifact_set.rarities:
+                sets_by_rarity.setdefault(int(rarity), []).append(artifact_set)
+        self.sets_by_rarity = {rarity: tuple(sets) for rarity, sets in sets_by_rarity.items()}
+
+    def get_suitable_sets(self, rarity: int) -> tuple[Set, ...]:
+        suitable_sets = self.sets_by_rarity.get(rarity)
         if not suitable_sets:
             raise ValueError('Chosen Domain doesn\'t have sets of this rarity.')
         return suitable_sets
@@ -42,22 +52,22 @@ class MainStat:
 
     @property
     def value(self) -> float:
-        return round(self.values[self.level], 1)
+        return self.values[self.level]
 
     @property
-    def values(self) -> list[float]:
-        return [self.min + (self.max - self.min) / 20 * i for i in range(21)]
+    def values(self) -> tuple[float, ...]:
+        return get_main_stat_values(self.min, self.max)
 
     def upgrade(self):
         self.level += 1
 
     def print(self):
+        print(self.format())
+
+    def format(self) -> str:
         if '%' in self.name:
-            print(self.name[:-4])
-            print(f'{round(self.value, 1)}%')
-        else:
-            print(self.name)
-            print(round(self.value))
+            return f'{self.name[:-4]}\n{round(self.value, 1)}%'
+        return f'{self.name}\n{round(self.value)}'
 
 
 @dataclass
@@ -66,22 +76,43 @@ class SubStat:
     possible_values: list[float]
     probability: float = None
     proc_history: list[float] = field(default_factory=list)
+    rng: InitVar[random.Random] = random
 
-    def __post_init__(self):
-        self.upgrade()
+    def __post_init__(self, rng: random.Random):
+        if not self.proc_history:
+            self.upgrade(rng)
 
     @property
     def value(self) -> float:
         return sum(self.proc_history)
 
-    def upgrade(self):
-        self.proc_history.append(random.choice(self.possible_values))
+    def upgrade(self, rng: random.Random = random):
+        self.proc_history.append(rng.choice(self.possible_values))
 
     def print(self):
+        print(self.format())
+
+    def format(self) -> str:
         if '%' in self.name:
-            print(f'{self.name[:-4]}+{round(self.value, 1)}%')
-        else:
-            print(f'{self.name}+{round(self.value)}')
+            return f'{self.name[:-4]}+{round(self.value, 1)}%'
+        return f'{self.name}+{round(self.value)}'
+
+
+@dataclass(frozen=True)
+class SubStatPool:
+    """Sub stats an artifact can still get, sampled without changing the pool."""
+    tables: dict[frozenset[str], AliasTable]
+    excluded: frozenset[str] = frozenset()
+
+    def sample(self, number_of_stats: int, excluded: Iterable[str] = (),
+               rng: random.Random = random) -> list[SubStat]:
+        excluded = self.excluded.union(excluded)
+        random_sub_stats = []
+        for _ in range(number_of_stats):
+            stat = self.tables[excluded].sample(rng)
+            excluded = excluded | {stat.name}
+            random_sub_stats.append(SubStat(stat.name, stat.possible_values, stat.probability, rng=rng))
+        return random_sub_stats
 
 
 @dataclass
@@ -89,6 +120,19 @@ class ArtifactType:
     name: str
     main_stats: list[MainStat]
     sub_stats: list[SubStat]
+    sub_stat_tables: dict[frozenset[str], AliasTable] = field(default=None, repr=False)
+    main_stat_table: AliasTable = field(init=False, repr=False)
+    sub_stat_pools: dict[Optional[str], SubStatPool] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.sub_stat_tables is None:
+            self.sub_stat_tables = SubStatTables(self.sub_stats)
+        self.main_stat_table = AliasTable.from_weights(self.main_stats, self.main_probabilities)
+        sub_stat_names = {stat.name for stat in self.sub_stats}
+        self.sub_stat_pools = {None: SubStatPool(self.sub_stat_tables)}
+        for main_stat in self.main_stats:
+            excluded = frozenset({main_stat.name} & sub_stat_names)
+            self.sub_stat_pools[main_stat.name] = SubStatPool(self.sub_stat_tables, excluded)
 
     @property
     def main_probabilities(self) -> list[float]:
@@ -98,27 +142,12 @@ class ArtifactType:
     def sub_probabilities(self) -> list[float]:
         return [stat.probability for stat in self.sub_stats]
 
-    def get_random_sub_stats(self, number_of_stats: int) -> list[SubStat]:
-        random_sub_stats = []
-        for _ in range(number_of_stats):
-            stat = random.choices(self.sub_stats, weights=self.sub_probabilities, k=1)[0]
-            random_sub_stats.append(stat)
-            self.delete_sub_stat(stat.name)
-        return random_sub_stats
-
-    def delete_sub_stat(self, name: str):
-        for stat in self.sub_stats:
-            if stat.name == name:
-                self.sub_stats.remove(stat)
-        self.__recalculate_sub_probabilities()
-
-    def __recalculate_sub_probabilities(self):
-        if sum(self.sub_probabilities) != 1.0:
-            for stat in self.sub_stats:
-                stat.probability /= sum(self.sub_probabilities)
+    def get_random_sub_stats(self, number_of_stats: int, main_stat_name: str = None,
+                             excluded: Iterable[str] = (), rng: random.Random = random) -> list[SubStat]:
+        return self.sub_stat_pools[main_stat_name].sample(number_of_stats, excluded, rng)
 
-    def get_random_main_stat(self):
-        return random.choices(self.main_stats, weights=self.main_probabilities, k=1)[0]
+    def get_random_main_stat(self, rng: random.Random = random) -> MainStat:
+        return replace(self.main_stat_table.sample(rng))
 
 
 @dataclass
@@ -131,35 +160,71 @@ class Artifact:
     set: Set
     level: int = 0
 
-    def __post_init__(self):
-        self.type.delete_sub_stat(self.main_stat.name)
-
-    def upgrade(self):
+    def upgrade(self, rng: random.Random = random):
         if self.level < self.rarity * 4:
             self.level += 1
             self.main_stat.upgrade()
             if self.level % 4 == 0:
-                self.__upgrade_sub_stats()
+                self.__upgrade_sub_stats(rng)
         else:
             print('Max Level Reached')
 
-    def __upgrade_sub_stats(self):
+    def upgrade_to(self, level: int, rng: random.Random = random):
+        """Upgrade to level (capped at max) at once, silently, applying every pending sub stat upgrade."""
+        level = min(level, self.rarity * 4)
+        if level <= self.level:
+            return
+        events = level // 4 - self.level // 4
+        self.main_stat.level += level - self.level
+        self.level = level
+
+        added = min(events, 4 - len(self.sub_stats))
+        if added:
+            present = [stat.name for stat in self.sub_stats]
+            self.sub_stats.extend(self.type.get_random_sub_stats(added, self.main_stat.name, present, rng))
+        for stat in rng.choices(self.sub_stats, k=events - added):
+            stat.upgrade(rng)
+
+    def upgrade_to_max(self, rng: random.Random = random):
+        self.upgrade_to(self.rarity * 4, rng)
+
+    def __upgrade_sub_stats(self, rng: random.Random):
         if len(self.sub_stats) < 4:
-            self.sub_stats.append(self.type.get_random_sub_stats(1)[0])
+            present = [stat.name for stat in self.sub_stats]
+            self.sub_stats.append(self.type.get_random_sub_stats(1, self.main_stat.name, present, rng)[0])
         else:
-            random.choice(self.sub_stats).upgrade()
+            rng.choice(self.sub_stats).upgrade(rng)
 
     def print(self):
-        print(f'\n{self.name} ({self.type.name})')
-
-        self.main_stat.print()
+        print(self.format())
 
-        for _ in range(self.rarity):
-            print('★', end='')
-        print(f'     [+{self.level}]')
-        print('--------------------------')
-        for stat in self.sub_stats:
-            stat.print()
+    def format(self) -> str:
+        lines = [f'\n{self.name} ({self.type.name})',
+                 self.main_stat.format(),
+                 f'{"★" * self.rarity}     [+{self.level}]',
+                 '--------------------------']
+        return '\n'.join(lines + [stat.format() for stat in self.sub_stats])
 
     def print_short(self):
-        print(f'{self.rarity}★ {self.name}')
+        print(self.format_short())
+
+    def format_short(self) -> str:
+        return f'{self.rarity}★ {self.name}'
+
+
+@dataclass
+class CompactArtifact:
+    """Artifact packed into small ints, see ArtifactGenerator.compact and expand.
+
+    set, type and main_stat are ids into ArtifactGenerator sets, ARTIFACT_TYPE_NAMES and
+    MAIN_STAT_NAMES, sub_stats holds SUB_STAT_NAMES ids and rolls holds one byte per sub
+    stat proc: its slot in sub_stats << 4 | index of the rolled value in possible_values.
+    """
+    __slots__ = ('set', 'type', 'rarity', 'level', 'main_stat', 'sub_stats', 'rolls')
+    set: int
+    type: int
+    rarity: int
+    level: int
+    main_stat: int
+    sub_stats: bytes
+    rolls: bytes
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Union
+from artifact_generator import ArtifactGenerator, ARTIFACT_TYPE_NAMES, DOMAINS, GRAND_ROLL_RARITIES, get_domain_id
+
+DropKey = tuple[str, int, str, str, str]
+
+
+@dataclass(frozen=True)
+class DropChance:
+    """Chance that one domain run drops at least one matching artifact, and how many it drops on average."""
+    per_run: float
+    expected_per_run: float
+
+    def within(self, runs: int) -> float:
+        """Chance of at least one matching artifact in runs runs."""
+        return 1 - (1 - self.per_run) ** runs
+
+    def expected(self, runs: int) -> float:
+        return self.expected_per_run * runs
+
+
+NO_DROP = DropChance(0.0, 0.0)
+
+
+@dataclass(frozen=True)
+class DropTable:
+    """Exact drop chances of every (domain, rarity, set, type, main stat), None standing for any.
+
+    Every artifact of a run independently gets a uniform set among the domain's sets of its
+    rarity, a uniform type and a main stat by weight, so an artifact matches with probability
+    q and a run with c artifacts of that rarity misses with probability (1 - q) ** c.
+    """
+    chances: dict[DropKey, DropChance]
+
+    @classmethod
+    def from_generator(cls, generator: ArtifactGenerator) -> 'DropTable':
+        chances = {}
+        for domain in generator.domains:
+            misses, expected = {}, {}
+            for rarity, counts, weights in GRAND_ROLL_RARITIES:
+                count_probabilities = [(count, weight / sum(weights)) for count, weight in zip(counts, weights)]
+                for key, q in get_artifact_probabilities(generator, domain.name, rarity).items():
+                    miss = sum(p * (1 - q) ** count for count, p in count_probabilities)
+                    mean = sum(p * count * q for count, p in count_probabilities)
+                    chances[(domain.name, rarity) + key] = DropChance(1 - miss, mean)
+                    misses[key] = misses.get(key, 1.0) * miss
+                    expected[key] = expected.get(key, 0.0) + mean
+            for key in misses:
+                chances[(domain.name, None) + key] = DropChance(1 - misses[key], expected[key])
+        return cls(chances)
+
+    def get(self, domain: Union[str, int], rarity: int = None, set_name: str = None,
+            artifact_type: str = None, main_stat: str = None) -> DropChance:
+        """Chance of a matching drop, NO_DROP when nothing in the domain matches; unknown domains raise ValueError."""
+        domain = DOMAINS[get_domain_id(domain)]
+        return self.chances.get((domain, rarity, set_name, artifact_type, main_stat), NO_DROP)
+
+    def probability(self, domain: Union[str, int], rarity: int = None, set_name: str = None,
+                    artifact_type: str = None, main_stat: str = None, runs: int = 1) -> float:
+        return self.get(domain, rarity, set_name, artifact_type, main_stat).within(runs)
+
+
+def get_artifact_probabilities(generator: ArtifactGenerator, domain: str,
+                               rarity: int) -> dict[tuple[str, str, str], float]:
+    """Chance that one artifact of rarity matches every (set, type, main stat) key, None standing for any."""
+    probabilities = {}
+    sets = generator.get_domain(domain).get_suitable_sets(rarity)
+    for artifact_set in sets:
+        for artifact_type in generator.artifact_types[rarity - 1]:
+            total = sum(stat.probability for stat in artifact_type.main_stats)
+            for stat in artifact_type.main_stats:
+                q = stat.probability / total / len(sets) / len(ARTIFACT_TYPE_NAMES)
+                for set_key in (artifact_set.name, None):
+                    for type_key in (artifact_type.name, None):
+                        for stat_key in (stat.name, None):
+                            key = (set_key, type_key, stat_key)
+                            probabilities[key] = probabilities.get(key, 0.0) + q
+    return probabilities
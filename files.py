@@ -0,0 +1,21 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = None) -> Iterator[IO]:
+    """File to write path's new content to, replacing path only once the block exits cleanly.
+
+    The temporary file is named after the process and thread, so concurrent writers never share one,
+    and readers only ever see the old or the new complete file.
+    """
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, mode, encoding=encoding) as file:
+            yield file
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,157 @@
+import cProfile
+import math
+import pstats
+import random
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Union
+import artifact_generator
+from artifact_generator import ArtifactGenerator
+from datatypes import Artifact, ArtifactType
+
+INSTRUMENTED_FUNCTIONS = {
+    'load': (artifact_generator, 'load_generator_data'),
+    'load_cache_read': (artifact_generator, 'read_data_cache'),
+    'load_cache_write': (artifact_generator, 'write_data_cache'),
+    'build_artifact_types': (artifact_generator, 'build_artifact_types'),
+    'build_domain': (artifact_generator, 'build_domain'),
+    'grand_roll': (ArtifactGenerator, 'grand_roll'),
+    'roll': (ArtifactGenerator, 'roll'),
+    'grand_roll_batch': (ArtifactGenerator, 'grand_roll_batch'),
+    'upgrade_batch': (ArtifactGenerator, 'upgrade_batch'),
+    'sample_main_stat': (ArtifactType, 'get_random_main_stat'),
+    'sample_sub_stats': (ArtifactType, 'get_random_sub_stats'),
+    'upgrade': (Artifact, 'upgrade'),
+    'upgrade_to': (Artifact, 'upgrade_to'),
+}
+
+_active: 'Instrumentation' = None
+
+
+@dataclass
+class Timing:
+    """Call count and durations in seconds, histogram buckets are keyed by their power of two upper bound."""
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = 0.0
+    buckets: Counter = field(default_factory=Counter)
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.min = min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+        self.buckets[math.frexp(elapsed)[1]] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict:
+        return {'count': self.count,
+                'total': self.total,
+                'mean': self.mean,
+                'min': self.min if self.count else 0.0,
+                'max': self.max,
+                'histogram': {2.0 ** exponent: self.buckets[exponent] for exponent in sorted(self.buckets)}}
+
+
+class Instrumentation:
+    """Times the generator hot paths while the context is active.
+
+    The instrumented functions are wrapped on enter and restored on exit, so nothing is
+    measured, and nothing costs anything, outside of the context. Timings are inclusive:
+    roll contains its sample_main_stat and sample_sub_stats calls.
+
+        with Instrumentation() as instrumentation:
+            generator.grand_roll('Domain of Guyun')
+        print(instrumentation.report())
+    """
+
+    def __init__(self, functions: dict[str, tuple[Any, str]] = None):
+        self.functions = INSTRUMENTED_FUNCTIONS if functions is None else functions
+        self.timings = {name: Timing() for name in self.functions}
+        self._originals = {}
+
+    def __enter__(self) -> 'Instrumentation':
+        global _active
+        if _active is not None:
+            raise RuntimeError('Instrumentation is already active.')
+        _active = self
+        for name, (owner, attribute) in self.functions.items():
+            original = vars(owner)[attribute]
+            self._originals[name] = original
+            setattr(owner, attribute, timed(original, self.timings[name]))
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        for name, (owner, attribute) in self.functions.items():
+            setattr(owner, attribute, self._originals.pop(name))
+        _active = None
+
+    def reset(self):
+        for timing in self.timings.values():
+            timing.__init__()
+
+    def stats(self) -> dict[str, dict]:
+        """Snapshot of every timing that was called at least once."""
+        return {name: timing.as_dict() for name, timing in self.timings.items() if timing.count}
+
+    def report(self) -> str:
+        lines = [f'{"":<20} {"calls":>10} {"total s":>10} {"mean µs":>10} {"max µs":>10}']
+        for name, timing in self.stats().items():
+            lines.append(f'{name:<20} {timing["count"]:>10} {timing["total"]:>10.3f} '
+                         f'{timing["mean"] * 1e6:>10.2f} {timing["max"] * 1e6:>10.2f}')
+        return '\n'.join(lines)
+
+
+def timed(function: Callable, timing: Timing) -> Callable:
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timing.add(perf_counter() - start)
+    return wrapper
+
+
+def roll_and_upgrade(generator: ArtifactGenerator, domain: Union[str, int], n_rolls: int,
+                     rng: random.Random) -> list[Artifact]:
+    artifacts = []
+    for _ in range(n_rolls):
+        for artifact in generator.grand_roll(domain, rng):
+            artifact.upgrade_to_max(rng)
+            artifacts.append(artifact)
+    return artifacts
+
+
+def profile_rolls(generator: ArtifactGenerator, domain: Union[str, int], n_rolls: int,
+                  rng: random.Random = None) -> pstats.Stats:
+    """cProfile of n_rolls grand rolls with every artifact upgraded to max level."""
+    rng = random.Random() if rng is None else rng
+    profiler = cProfile.Profile()
+    profiler.runcall(roll_and_upgrade, generator, domain, n_rolls, rng)
+    return pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+
+
+def trace_rolls(generator: ArtifactGenerator, domain: Union[str, int], n_rolls: int,
+                rng: random.Random = None, frames: int = 1) -> tracemalloc.Snapshot:
+    """tracemalloc snapshot of what n_rolls upgraded grand rolls keep allocated, taken while they are alive."""
+    rng = random.Random() if rng is None else rng
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(frames)
+    try:
+        artifacts = roll_and_upgrade(generator, domain, n_rolls, rng)
+        snapshot = tracemalloc.take_snapshot()
+        del artifacts
+        return snapshot
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
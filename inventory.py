@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+import numpy as np
+from artifact_generator import SUB_STAT_NAMES
+from datatypes import Artifact
+
+SUB_STAT_INDEX = {name: i for i, name in enumerate(SUB_STAT_NAMES)}
+
+InventoryKey = tuple[str, str, str]
+
+
+@dataclass
+class FrontierBlock:
+    """Frontier artifacts sharing one set of sub stats, values[:len(self)] holds their sub stat vectors."""
+    values: np.ndarray = field(default_factory=lambda: np.empty((8, len(SUB_STAT_NAMES))))
+    artifacts: list[Artifact] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.artifacts)
+
+    def dominates(self, values: np.ndarray) -> bool:
+        return bool(np.all(self.values[:len(self)] >= values, axis=1).any())
+
+    def remove_dominated(self, values: np.ndarray):
+        size = len(self)
+        kept = ~np.all(values >= self.values[:size], axis=1)
+        if not kept.all():
+            self.values[:kept.sum()] = self.values[:size][kept]
+            self.artifacts = [artifact for artifact, keep in zip(self.artifacts, kept) if keep]
+
+    def append(self, artifact: Artifact, values: np.ndarray):
+        size = len(self)
+        if size == len(self.values):
+            self.values = np.concatenate((self.values, np.empty_like(self.values)))
+        self.values[size] = values
+        self.artifacts.append(artifact)
+
+
+@dataclass
+class Frontier:
+    """Artifacts no other artifact of the frontier beats or equals in every sub stat.
+
+    Sub stats an artifact doesn't have count as 0, so only artifacts having all of its sub
+    stats can dominate it. Blocks are keyed by the bit mask of their sub stats and a new
+    artifact is only compared to the blocks of supersets and subsets of its own.
+    """
+    blocks: dict[int, FrontierBlock] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self.blocks.values())
+
+    @property
+    def artifacts(self) -> list[Artifact]:
+        return [artifact for block in self.blocks.values() for artifact in block.artifacts]
+
+    def add(self, artifact: Artifact, values: np.ndarray, mask: int) -> bool:
+        """Adds artifact unless it is dominated, dropping the artifacts it dominates."""
+        for block_mask, block in self.blocks.items():
+            if block_mask & mask == mask and block.dominates(values):
+                return False
+        for block_mask, block in self.blocks.items():
+            if block_mask & mask == block_mask:
+                block.remove_dominated(values)
+        block = self.blocks.get(mask)
+        if block is None:
+            block = self.blocks[mask] = FrontierBlock()
+        block.append(artifact, values)
+        return True
+
+
+@dataclass
+class Inventory:
+    """Pareto frontiers of sub stat values per (type, set, main stat).
+
+    An added artifact is only compared to the frontier of its own key, and artifacts another
+    one dominates are dropped, so the inventory never holds more than the frontiers. Compare
+    artifacts at the same level, e.g. all upgraded to max.
+    """
+    frontiers: dict[InventoryKey, Frontier] = field(default_factory=dict)
+    added: int = 0
+    rejected: int = 0
+
+    def __len__(self) -> int:
+        return sum(len(frontier) for frontier in self.frontiers.values())
+
+    def __iter__(self) -> Iterator[Artifact]:
+        for frontier in self.frontiers.values():
+            yield from frontier.artifacts
+
+    def add(self, artifact: Artifact) -> bool:
+        """True when artifact is kept, False when a kept artifact is at least as good in every sub stat."""
+        key = get_key(artifact)
+        frontier = self.frontiers.get(key)
+        if frontier is None:
+            frontier = self.frontiers[key] = Frontier()
+        self.added += 1
+        values, mask = get_sub_stat_vector(artifact)
+        if frontier.add(artifact, values, mask):
+            return True
+        self.rejected += 1
+        return False
+
+    def add_all(self, artifacts: Iterable[Artifact]) -> list[Artifact]:
+        """Adds a grand_roll result, returns the artifacts that were kept."""
+        return [artifact for artifact in artifacts if self.add(artifact)]
+
+    def get(self, artifact_type: str, set_name: str, main_stat: str) -> list[Artifact]:
+        frontier = self.frontiers.get((artifact_type, set_name, main_stat))
+        return [] if frontier is None else frontier.artifacts
+
+
+def get_key(artifact: Artifact) -> InventoryKey:
+    return artifact.type.name, artifact.set.name, artifact.main_stat.name
+
+
+def get_sub_stat_vector(artifact: Artifact) -> tuple[np.ndarray, int]:
+    """Sub stat values in SUB_STAT_NAMES order, and the bit mask of the sub stats the artifact has."""
+    values = np.zeros(len(SUB_STAT_NAMES))
+    mask = 0
+    for stat in artifact.sub_stats:
+        index = SUB_STAT_INDEX[stat.name]
+        values[index] = stat.value
+        mask |= 1 << index
+    return values, mask
@@ -1,14 +1,17 @@
-import json
-import requests
-from copy import deepcopy
-from bs4 import BeautifulSoup
+import hashlib
+from dataclasses import replace
 from datatypes import Set
 from artifact_generator import DOMAINS
+from data_files import get_data_path, read_json, write_json
+from fetcher import Fetcher
+from parsing import INFOBOX, PARSER, SET_CARDS, map_pages, parse_fragments
 
+BUILD_MANIFEST = 'sets_build_manifest'
 
-def get_sets_links(sets_list_link: str) -> list[str]:
-    sets_page = requests.get(sets_list_link)
-    soup = BeautifulSoup(sets_page.text, 'html.parser')
+
+def get_sets_links(sets_list_link: str, fetcher: Fetcher) -> list[str]:
+    sets_page = fetcher.fetch(sets_list_link)
+    soup = parse_fragments(sets_page.text, SET_CARDS)
     set_divs = soup.find_all('div', {'class': 'card_with_caption'})
 
     links = []
@@ -17,24 +20,43 @@ def get_sets_links(sets_list_link: str) -> list[str]:
     return links[1:]  # Skip Initiate Set
 
 
-def parse_sets(sets_links) -> list[Set]:
-    sets_info = []
-    for link in sets_links:
-        page = requests.get(link)
-        soup = BeautifulSoup(page.text, 'html.parser')
-        info_table = soup.find('aside')
-        artifacts = info_table.find_all('a', {'class': 'image'})
+def parse_sets(sets_links, fetcher: Fetcher, previous_build: dict = None,
+               workers: int = 1) -> tuple[list[Set], dict]:
+    """Sets of every page, reusing the previous build's set when a page's content hash is unchanged.
+
+    The build maps every link to its page hash and parsed set, pass it back in on the next run.
+    Changed pages are parsed by parse_set_page in workers processes.
+    """
+    previous_build = {} if previous_build is None else previous_build
+    pages = {}
+    build = {}
+    for link, page in zip(sets_links, fetcher.fetch_all(sets_links)):
+        page_hash = hashlib.sha256(page.text.encode()).hexdigest()
+        previous = previous_build.get(link)
+        if previous is not None and previous['hash'] == page_hash:
+            build[link] = previous
+        else:
+            pages[link] = page.text
+            build[link] = {'hash': page_hash}
+
+    for link, set_info in zip(pages, map_pages(parse_set_page, pages, pages.values(), workers=workers)):
+        build[link]['set'] = vars(set_info)
+    return [Set(**build[link]['set']) for link in sets_links], build
+
 
-        name = info_table.find('h2').text
-        artifact_names = [artifact.next['alt'] for artifact in artifacts]
-        artifact_images = [artifact['href'] for artifact in artifacts]
-        bonuses = parse_bonuses(info_table)
-        obtain_locations = parse_obtain_locations(info_table)
-        rarities = list(obtain_locations.keys())
-        fix_inconsistency(link, obtain_locations)
+def parse_set_page(link: str, page: str, parser: str = PARSER) -> Set:
+    soup = parse_fragments(page, INFOBOX, parser)
+    info_table = soup.find('aside')
+    artifacts = info_table.find_all('a', {'class': 'image'})
 
-        sets_info.append(Set(name, artifact_names, artifact_images, bonuses, rarities, obtain_locations))
-    return sets_info
+    name = info_table.find('h2').text
+    artifact_names = [artifact.next['alt'] for artifact in artifacts]
+    artifact_images = [artifact['href'] for artifact in artifacts]
+    bonuses = parse_bonuses(info_table)
+    obtain_locations = parse_obtain_locations(info_table)
+    rarities = list(obtain_locations.keys())
+    fix_inconsistency(link, obtain_locations)
+    return Set(name, artifact_names, artifact_images, bonuses, rarities, obtain_locations)
 
 
 def parse_bonuses(info_table):
@@ -67,43 +89,44 @@ def fix_inconsistency(link, obtain_locations):
 
 
 def get_sets_from_domains(sets_info: list[Set]) -> list[Set]:
+    """Sets with their non domain locations, and the rarities left without locations, filtered out."""
     sets_from_domains = []
     for set in sets_info:
-        delete_non_domain_locations(set)
-        if set.obtain_locations:
-            sets_from_domains.append(set)
+        obtain_locations = get_domain_locations(set)
+        if obtain_locations:
+            sets_from_domains.append(replace(set, rarities=list(obtain_locations), obtain_locations=obtain_locations))
     return sets_from_domains
 
 
-def delete_non_domain_locations(set: Set):
-    rarities = list(set.obtain_locations.keys())
-    for rarity in rarities:
-        domain_locations = []
-        for location in set.obtain_locations[rarity]:
-            if location in DOMAINS:
-                domain_locations.append(location)
+def get_domain_locations(set: Set) -> dict[str, list[str]]:
+    obtain_locations = {}
+    for rarity, locations in set.obtain_locations.items():
+        domain_locations = [location for location in locations if location in DOMAINS]
         if domain_locations:
-            set.obtain_locations[rarity] = domain_locations
-        else:
-            del set.obtain_locations[rarity]
-            set.rarities.remove(rarity)
+            obtain_locations[rarity] = domain_locations
+    return obtain_locations
 
 
-def save_sets_to_json(sets, file_name: str):
+def save_sets_to_json(sets, file_name: str) -> bool:
     sets_dict = {}
     for i, set in enumerate(sets):
         sets_dict[i] = vars(set)
-    with open(f'../data/{file_name}.json', 'w', encoding='UTF-8') as file:
-        json.dump(sets_dict, file)
+    return write_json(get_data_path(file_name), sets_dict)
 
 
 def main():
     sets_list_link = 'https://genshin-impact.fandom.com/wiki/Artifacts'
-    sets_links = get_sets_links(sets_list_link)
-    sets = parse_sets(deepcopy(sets_links))
-    sets_from_domains = get_sets_from_domains(deepcopy(sets))
-    save_sets_to_json(sets, 'sets')
-    save_sets_to_json(sets_from_domains, 'sets_from_domains')
+    previous_build = read_json(get_data_path(BUILD_MANIFEST), {})
+    with Fetcher() as fetcher:
+        sets_links = get_sets_links(sets_list_link, fetcher)
+        sets, build = parse_sets(sets_links, fetcher, previous_build)
+    reparsed = sum(previous_build.get(link, {}).get('hash') != build[link]['hash'] for link in build)
+    print(f'Reparsed {reparsed} of {len(build)} set pages.')
+
+    for file_name, file_sets in (('sets', sets), ('sets_from_domains', get_sets_from_domains(sets))):
+        if save_sets_to_json(file_sets, file_name):
+            print(f'Updated {file_name}.json')
+    write_json(get_data_path(BUILD_MANIFEST), build)
 
 
 if __name__ == '__main__':
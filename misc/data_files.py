@@ -0,0 +1,31 @@
+import json
+import os
+from files import atomic_write
+
+DATA_DIR = '../data'
+
+
+def get_data_path(file_name: str) -> str:
+    return os.path.join(DATA_DIR, f'{file_name}.json')
+
+
+def read_json(path: str, default=None):
+    try:
+        with open(path, 'r', encoding='UTF-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+def write_json(path: str, data) -> bool:
+    """Atomically replaces path with data as JSON, leaving the file untouched when its content is the same."""
+    content = json.dumps(data)
+    try:
+        with open(path, 'r', encoding='UTF-8') as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with atomic_write(path, encoding='UTF-8') as file:
+        file.write(content)
+    return True
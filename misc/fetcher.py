@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable
+import requests
+from requests.adapters import HTTPAdapter
+from files import atomic_write
+
+CACHE_DIR = '.http_cache'
+MAX_WORKERS = 8
+
+
+@dataclass
+class Page:
+    url: str
+    text: str
+    changed: bool
+
+
+@dataclass
+class Fetcher:
+    """Fetches pages through one pooled requests.Session and an on-disk cache keyed by URL.
+
+    Cached pages are revalidated with their ETag and Last-Modified headers, so unchanged pages
+    come back as 304 without a body. Page.changed tells whether the content differs from the
+    cached copy.
+    """
+    cache_dir: str = CACHE_DIR
+    max_workers: int = MAX_WORKERS
+    timeout: float = 30.0
+    session: requests.Session = field(default=None, repr=False)
+
+    def __post_init__(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if self.session is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+
+    def __enter__(self) -> 'Fetcher':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.session.close()
+
+    def fetch(self, url: str) -> Page:
+        path = os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest())
+        cached = read_cache_entry(path)
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            return Page(url, cached['text'], changed=False)
+        response.raise_for_status()
+
+        text = response.text
+        write_cache_entry(path, {'url': url,
+                                 'etag': response.headers.get('ETag'),
+                                 'last_modified': response.headers.get('Last-Modified'),
+                                 'text': text})
+        return Page(url, text, changed=cached is None or cached['text'] != text)
+
+    def fetch_all(self, urls: Iterable[str]) -> list[Page]:
+        """Pages in the order of urls, fetched by up to max_workers threads."""
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            return list(executor.map(self.fetch, urls))
+
+
+def read_cache_entry(path: str):
+    try:
+        with open(path, 'r', encoding='UTF-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_entry(path: str, entry: dict):
+    with atomic_write(path, encoding='UTF-8') as file:
+        json.dump(entry, file)
@@ -1,8 +1,8 @@
-import json
-import requests
 from copy import deepcopy
-from bs4 import BeautifulSoup
 from datatypes import MainStat, SubStat
+from data_files import get_data_path, write_json
+from fetcher import Fetcher
+from parsing import WIKITABLES, parse_fragments
 
 
 ARTIFACT_TYPE_FOR_STATS = {
@@ -19,16 +19,17 @@ SANDS_PROB = [0.2668, 0.2668, 0.2668, 0.1, 0.1]
 GOBLET_PROB = [0.2125, 0.2125, 0.2, 0.05, 0.05, 0.05, 0.05, 0.05, 0.05, 0.05, 0.025]
 CIRCLET_PROB = [0.22, 0.22, 0.22, 0.1, 0.1, 0.1, 0.04]
 SUB_STATS_PROB = [0.1364, 0.1364, 0.1364, 0.0909, 0.0909, 0.0909, 0.0909, 0.0909, 0.06815, 0.06815]
+SCALING_LINK = 'https://genshin-impact.fandom.com/wiki/Artifacts/Scaling'
 
 
-def parse_stats(link: str) -> tuple[dict, dict]:
-    stats_page = requests.get(link)
-    soup = BeautifulSoup(stats_page.text, 'html.parser')
+def parse_stats(link: str, fetcher: Fetcher) -> tuple[dict, dict]:
+    stats_page, scaling_page = fetcher.fetch_all([link, SCALING_LINK])
+    soup = parse_fragments(stats_page.text, WIKITABLES)
     stats_tables = soup.find_all('table', {'class': 'wikitable'})
     main_stats = parse_main_stats(stats_tables[:5])
     sub_stats = parse_sub_stats(stats_tables[-1])
 
-    low_rarity_main_stats = parse_low_rarity_main_stats(main_stats)
+    low_rarity_main_stats = parse_low_rarity_main_stats(main_stats, scaling_page.text)
     main_stats.update(low_rarity_main_stats)
 
     return main_stats, sub_stats
@@ -65,10 +66,8 @@ def parse_sub_stats(table) -> dict[int, list[SubStat]]:
     return stats
 
 
-def parse_low_rarity_main_stats(high_rarity_main_stats):
-    link = 'https://genshin-impact.fandom.com/wiki/Artifacts/Scaling'
-    stats_page = requests.get(link)
-    soup = BeautifulSoup(stats_page.text, 'html.parser')
+def parse_low_rarity_main_stats(high_rarity_main_stats, scaling_page: str):
+    soup = parse_fragments(scaling_page, WIKITABLES)
 
     main_stats = {
         1: deepcopy(ARTIFACT_TYPE_FOR_STATS),
@@ -115,7 +114,7 @@ def append_sub_stats_probabilities(stats):
             stat.probability = SUB_STATS_PROB[j]
 
 
-def save_main_stats_to_json(main_stats, file_name: str):
+def save_main_stats_to_json(main_stats, file_name: str) -> bool:
     serializable_stats = {}
     for rarity in main_stats.keys():
         serializable_stats[rarity] = {}
@@ -123,23 +122,27 @@ def save_main_stats_to_json(main_stats, file_name: str):
             serializable_stats[rarity][artifact_type] = []
             for stat in main_stats[rarity][artifact_type]:
                 serializable_stats[rarity][artifact_type].append(vars(stat))
-    with open(f'../data/{file_name}.json', 'w', encoding='UTF-8') as file:
-        json.dump(serializable_stats, file)
+    return write_json(get_data_path(file_name), serializable_stats)
 
 
-def save_sub_stats_to_json(sub_stats, file_name: str):
+def save_sub_stats_to_json(sub_stats, file_name: str) -> bool:
     serializable_stats = {}
     for rarity in sub_stats.keys():
         serializable_stats[rarity] = []
         for stat in sub_stats[rarity]:
-            serializable_stats[rarity].append(vars(stat))
-    with open(f'../data/{file_name}.json', 'w', encoding='UTF-8') as file:
-        json.dump(serializable_stats, file)
+            serializable_stats[rarity].append(get_sub_stat_entry(stat))
+    return write_json(get_data_path(file_name), serializable_stats)
+
+
+def get_sub_stat_entry(stat: SubStat) -> dict:
+    """Sub stat as saved, without the proc history SubStat rolls when it is created."""
+    return {'name': stat.name, 'possible_values': stat.possible_values, 'probability': stat.probability}
 
 
 def main():
     stats_link = 'https://genshin-impact.fandom.com/wiki/Artifacts/Stats'
-    main_stats, sub_stats = parse_stats(stats_link)
+    with Fetcher() as fetcher:
+        main_stats, sub_stats = parse_stats(stats_link, fetcher)
     append_main_stats_probabilities(main_stats)
     append_sub_stats_probabilities(sub_stats)
 
@@ -0,0 +1,126 @@
+import heapq
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from artifact_generator import ArtifactGenerator, ARTIFACT_TYPE_NAMES
+from batch import ArtifactBatch
+from scoring import BuildTarget
+
+SetBonuses = dict[str, dict[int, float]]
+
+
+@dataclass(frozen=True)
+class Loadout:
+    """One artifact per slot: rows index the inventory in ARTIFACT_TYPE_NAMES order."""
+    score: float
+    bonus: float
+    rows: tuple[int, ...]
+    sets: tuple[str, ...]
+
+
+def optimize_loadout(generator: ArtifactGenerator, inventory: ArtifactBatch, target: BuildTarget,
+                     set_bonuses: SetBonuses = None, n_results: int = 1) -> list[Loadout]:
+    """Best n_results loadouts by the sum of target scores plus set bonuses, best first.
+
+    set_bonuses gives the score of every piece bonus of a set, e.g. {'Gladiator\'s Finale': {2: 18.0, 4: 35.0}};
+    sets without bonuses only count through their artifacts. target's filters pick which artifacts
+    may go to a slot, its threshold is ignored.
+
+    Only the n_results best artifacts of every (slot, bonus set) pair, and of the other sets taken
+    together, can be part of an optimal loadout, which leaves a few candidates per slot. They are
+    searched depth-first with branch-and-bound, bounding the bonus still reachable with the
+    remaining slots from the memoized set counts.
+    """
+    set_bonuses = {} if set_bonuses is None else set_bonuses
+    bonus_names = list(set_bonuses)
+    bonus_table = get_bonus_table(generator, set_bonuses)
+    set_keys = np.full(len(generator.sets), len(bonus_names), dtype=np.int64)
+    for i, name in enumerate(bonus_names):
+        set_keys[generator.get_set_id(get_set(generator, name))] = i
+
+    compiled = target.compile(generator)
+    rows = np.flatnonzero(compiled.eligible(inventory))
+    candidates = get_candidates(rows, compiled.score(inventory.select(rows)), inventory.type[rows],
+                                set_keys[inventory.set[rows]], n_results)
+    if any(not slot for slot in candidates):
+        return []
+    suffix_max = np.cumsum([max(score for _, score, _ in slot) for slot in candidates][::-1])[::-1].tolist() + [0.0]
+    n_slots = len(candidates)
+
+    @lru_cache(maxsize=None)
+    def get_bonus_bound(remaining: int, counts: tuple[int, ...]) -> float:
+        """Most bonus remaining more pieces can add, ignoring which slots have which sets."""
+        if not remaining:
+            return 0.0
+        bound = get_bonus_bound(remaining - 1, counts)
+        for key, count in enumerate(counts):
+            gain = bonus_table[key][count + 1] - bonus_table[key][count]
+            added = counts[:key] + (count + 1,) + counts[key + 1:]
+            bound = max(bound, gain + get_bonus_bound(remaining - 1, added))
+        return bound
+
+    results = []
+    order = 0
+
+    def search(depth: int, counts: tuple[int, ...], score: float, bonus: float, chosen: tuple[int, ...]):
+        nonlocal order
+        if depth == n_slots:
+            order += 1
+            entry = (score + bonus, -order, bonus, chosen)
+            if len(results) < n_results:
+                heapq.heappush(results, entry)
+            elif entry > results[0]:
+                heapq.heapreplace(results, entry)
+            return
+        for row, row_score, key in candidates[depth]:
+            next_counts, next_bonus = counts, bonus
+            if key < len(counts):
+                next_counts = counts[:key] + (counts[key] + 1,) + counts[key + 1:]
+                next_bonus += bonus_table[key][counts[key] + 1] - bonus_table[key][counts[key]]
+            bound = (score + row_score + suffix_max[depth + 1] + next_bonus
+                     + get_bonus_bound(n_slots - depth - 1, next_counts))
+            if len(results) == n_results and bound <= results[0][0]:
+                continue
+            search(depth + 1, next_counts, score + row_score, next_bonus, chosen + (row,))
+
+    search(0, (0,) * len(bonus_names), 0.0, 0.0, ())
+    return [Loadout(score=total,
+                    bonus=bonus,
+                    rows=chosen,
+                    sets=tuple(generator.sets[inventory.set[row]].name for row in chosen))
+            for total, _, bonus, chosen in sorted(results, reverse=True)]
+
+
+def get_candidates(rows: np.ndarray, scores: np.ndarray, types: np.ndarray, keys: np.ndarray,
+                   n: int) -> list[list[tuple[int, float, int]]]:
+    """The n best (row, score, set key) of every (slot, set key) pair, per slot best first."""
+    order = np.lexsort((-scores, keys, types))
+    group = types[order].astype(np.int64) * (keys.max(initial=0) + 1) + keys[order]
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    kept = order[rank < n]
+
+    candidates = [[] for _ in ARTIFACT_TYPE_NAMES]
+    for i in kept[np.argsort(-scores[kept], kind='stable')]:
+        candidates[types[i]].append((int(rows[i]), float(scores[i]), int(keys[i])))
+    return candidates
+
+
+def get_bonus_table(generator: ArtifactGenerator, set_bonuses: SetBonuses) -> list[list[float]]:
+    """Total bonus of every set for 0 to len(ARTIFACT_TYPE_NAMES) + 1 pieces."""
+    table = []
+    for name, bonuses in set_bonuses.items():
+        artifact_set = get_set(generator, name)
+        for pieces in bonuses:
+            if f'{pieces}-Piece Bonus' not in artifact_set.bonuses:
+                raise ValueError(f'Set \'{name}\' has no {pieces}-piece bonus.')
+        table.append([sum(value for pieces, value in bonuses.items() if pieces <= count)
+                      for count in range(len(ARTIFACT_TYPE_NAMES) + 2)])
+    return table
+
+
+def get_set(generator: ArtifactGenerator, name: str):
+    for artifact_set in generator.sets:
+        if artifact_set.name == name:
+            return artifact_set
+    raise ValueError(f'Set \'{name}\' not found.')
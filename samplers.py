@@ -0,0 +1,115 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from itertools import combinations
+from typing import TYPE_CHECKING, Any, Sequence
+import random
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class AliasTable:
+    """Walker's alias table (Vose's construction), one uniform draw per sample."""
+    items: tuple[Any, ...]
+    probabilities: tuple[float, ...]
+    aliases: tuple[int, ...]
+
+    @classmethod
+    def from_weights(cls, items: Sequence[Any], weights: Sequence[float]) -> 'AliasTable':
+        n = len(weights)
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+        probabilities = [1.0] * n
+        aliases = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] += scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        return cls(tuple(items), tuple(probabilities), tuple(aliases))
+
+    def sample(self, rng: random.Random = random) -> Any:
+        u = rng.random() * len(self.items)
+        i = int(u)
+        if u - i < self.probabilities[i]:
+            return self.items[i]
+        return self.items[self.aliases[i]]
+
+
+class SubStatTables(dict):
+    """Alias tables keyed by the frozenset of sub stat names taken out of the pool, built on first lookup.
+
+    An artifact excludes its main stat and the sub stats it already has, so rolling only builds
+    the tables of the states it actually reaches.
+    """
+
+    def __init__(self, sub_stats: Sequence[Any]):
+        super().__init__()
+        self.sub_stats = tuple(sub_stats)
+
+    def __missing__(self, excluded: frozenset[str]) -> AliasTable:
+        available = [stat for stat in self.sub_stats if stat.name not in excluded]
+        table = self[excluded] = AliasTable.from_weights(available, [stat.probability for stat in available])
+        return table
+
+    def build_all(self, max_excluded: int = 4) -> 'SubStatTables':
+        """Build the tables of every set of up to max_excluded names now, four cover every artifact state."""
+        names = [stat.name for stat in self.sub_stats]
+        for k in range(max_excluded + 1):
+            for excluded in combinations(names, k):
+                self[frozenset(excluded)]
+        return self
+
+
+class NumpyRandom(random.Random):
+    """random.Random drawing from a NumPy Generator, so datatypes can use NumPy bit generators.
+
+    Doubles and 64-bit words are drawn in blocks of buffer_size to amortize NumPy call overhead.
+    """
+
+    def __init__(self, generator: np.random.Generator = None, buffer_size: int = 1024):
+        import numpy as np
+        self.generator = generator if generator is not None else np.random.default_rng()
+        self.buffer_size = buffer_size
+        self._doubles, self._doubles_index = [], 0
+        self._words, self._words_index = [], 0
+        super().__init__()
+
+    def seed(self, a=None, version: int = 2):
+        if a is not None:
+            import numpy as np
+            self.generator = np.random.default_rng(a)
+            self._doubles, self._doubles_index = [], 0
+            self._words, self._words_index = [], 0
+
+    def random(self) -> float:
+        if self._doubles_index == len(self._doubles):
+            self._doubles, self._doubles_index = self.generator.random(self.buffer_size).tolist(), 0
+        self._doubles_index += 1
+        return self._doubles[self._doubles_index - 1]
+
+    def getrandbits(self, k: int) -> int:
+        bits, n = 0, 0
+        while n < k:
+            if self._words_index == len(self._words):
+                self._words, self._words_index = self.generator.bit_generator.random_raw(self.buffer_size).tolist(), 0
+            bits |= self._words[self._words_index] << n
+            self._words_index += 1
+            n += 64
+        return bits >> (n - k)
+
+    def getstate(self) -> tuple:
+        return (self.generator.bit_generator.state, self._doubles[self._doubles_index:],
+                self._words[self._words_index:])
+
+    def setstate(self, state: tuple):
+        self.generator.bit_generator.state, doubles, words = state
+        self._doubles, self._doubles_index = list(doubles), 0
+        self._words, self._words_index = list(words), 0
@@ -0,0 +1,142 @@
+import math
+from dataclasses import dataclass
+from typing import Iterable, Union
+import numpy as np
+from artifact_generator import ArtifactGenerator, ARTIFACT_TYPE_NAMES, DOMAINS, MAIN_STAT_NAMES, SUB_STAT_NAMES
+from batch import ArtifactBatch
+
+SCORE_TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True)
+class BuildTarget:
+    """Artifacts worth keeping: score = sum(weight * sub stat value) >= threshold.
+
+    types, main_stats and sets restrict which artifacts qualify, None allows any. Crit value
+    of at least 40 on ATK% Sands is
+    BuildTarget({'CRIT Rate (%)': 2, 'CRIT DMG (%)': 1}, 40, types=('Sands of Eon',), main_stats=('ATK (%)',)).
+    """
+    weights: dict[str, float]
+    threshold: float = 0.0
+    rarity: int = 5
+    types: tuple[str, ...] = None
+    main_stats: tuple[str, ...] = None
+    sets: tuple[str, ...] = None
+
+    def compile(self, generator: ArtifactGenerator) -> 'CompiledTarget':
+        weights = np.zeros(len(SUB_STAT_NAMES))
+        for name, weight in self.weights.items():
+            weights[get_index(SUB_STAT_NAMES, name, 'sub stat')] = weight
+        weighted_values = np.nan_to_num(generator.sub_stat_values) * weights[:, None]
+
+        set_names = [artifact_set.name for artifact_set in generator.sets]
+        return CompiledTarget(weighted_values=weighted_values,
+                              threshold=self.threshold,
+                              rarity=self.rarity,
+                              type_mask=get_mask(ARTIFACT_TYPE_NAMES, self.types, 'artifact type'),
+                              main_stat_mask=get_mask(MAIN_STAT_NAMES, self.main_stats, 'main stat'),
+                              set_mask=get_mask(set_names, self.sets, 'set'))
+
+
+@dataclass(frozen=True)
+class CompiledTarget:
+    """BuildTarget as lookup arrays over stat, type and set ids, evaluated on whole batches."""
+    weighted_values: np.ndarray
+    threshold: float
+    rarity: int
+    type_mask: np.ndarray
+    main_stat_mask: np.ndarray
+    set_mask: np.ndarray
+
+    def score(self, batch: ArtifactBatch) -> np.ndarray:
+        values = self.weighted_values[batch.rarity[:, None] - 1, np.maximum(batch.sub_stats, 0)]
+        return np.einsum('nst,nst->n', batch.sub_tiers, values)
+
+    def eligible(self, batch: ArtifactBatch) -> np.ndarray:
+        """Rows passing the rarity, type, main stat and set filters, whatever their score."""
+        mask = self.type_mask[batch.type] & self.main_stat_mask[batch.main_stat] & self.set_mask[batch.set]
+        if self.rarity is not None:
+            mask &= batch.rarity == self.rarity
+        return mask
+
+    def matches(self, batch: ArtifactBatch) -> np.ndarray:
+        mask = self.eligible(batch)
+        mask[mask] = self.score(batch.select(mask)) >= self.threshold - SCORE_TOLERANCE
+        return mask
+
+
+@dataclass(frozen=True)
+class RunsUntilSuccess:
+    """Runs until the first matching artifact, geometric with the per-run success rate estimated from runs."""
+    domain: str
+    runs: int
+    successes: int
+
+    @property
+    def probability(self) -> float:
+        return self.successes / self.runs if self.runs else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        p = self.probability
+        return math.sqrt(p * (1 - p) / self.runs) if self.runs else 0.0
+
+    @property
+    def expected_runs(self) -> float:
+        return 1 / self.probability if self.probability else math.inf
+
+    def pmf(self, max_runs: int) -> np.ndarray:
+        """P(first success on run k) for k = 1..max_runs."""
+        k = np.arange(max_runs)
+        return (1 - self.probability) ** k * self.probability
+
+    def cdf(self, runs: int) -> float:
+        return 1 - (1 - self.probability) ** runs
+
+    def quantile(self, q: float) -> float:
+        """Runs needed to succeed with probability q, infinite for q = 1 unless every run succeeds."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f'Quantile {q} is not in [0, 1].')
+        p = self.probability
+        if p == 1.0:
+            return 1
+        if p == 0.0 or q == 1.0:
+            return math.inf
+        return max(1, math.ceil(math.log1p(-q) / math.log1p(-p)))
+
+
+def estimate_runs_until_success(generator: ArtifactGenerator, target: BuildTarget,
+                                domains: Iterable[Union[str, int]] = None, n_runs: int = 100_000,
+                                level: int = None, seed: int = None,
+                                chunk_size: int = 10000) -> dict[str, RunsUntilSuccess]:
+    """Farms n_runs runs of every domain (all of them by default), upgrading artifacts to level
+    (max by default), and counts the runs dropping at least one artifact matching target."""
+    compiled = target.compile(generator)
+    domains = list(range(len(DOMAINS)) if domains is None else domains)
+    seeds = np.random.SeedSequence(seed).spawn(len(domains))
+    estimates = {}
+    for domain, domain_seed in zip(domains, seeds):
+        rng = np.random.default_rng(domain_seed)
+        successes = 0
+        for batch in generator.stream(domain, rng, chunk_size, n_runs):
+            batch = generator.upgrade_batch(batch, level, rng)
+            successes += len(np.unique(batch.run[compiled.matches(batch)]))
+        name = generator.get_domain(domain).name
+        estimates[name] = RunsUntilSuccess(name, n_runs, successes)
+    return estimates
+
+
+def get_index(names: list[str], name: str, kind: str) -> int:
+    try:
+        return names.index(name)
+    except ValueError:
+        raise ValueError(f'Unknown {kind} \'{name}\'.') from None
+
+
+def get_mask(names: list[str], allowed: Iterable[str], kind: str) -> np.ndarray:
+    if allowed is None:
+        return np.ones(len(names), dtype=bool)
+    mask = np.zeros(len(names), dtype=bool)
+    for name in allowed:
+        mask[get_index(names, name, kind)] = True
+    return mask
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from artifact_generator import ArtifactGenerator, DATA_DIR, DOMAINS
+from datatypes import Artifact, Domain
+
+HOST = '127.0.0.1'
+PORT = 8765
+END_OF_RESPONSE = '.'
+HELP = '\n'.join(['domains                  list domains',
+                  'domain <n>               choose domain n and roll it',
+                  'roll                     roll the chosen domain again',
+                  'list                     list the rolled artifacts',
+                  'show <n>                 show artifact n',
+                  'upgrade <n> [level]      upgrade artifact n by one level, or to level',
+                  'set <n>                  show the set bonuses of artifact n',
+                  'quit                     close the session'])
+
+
+@dataclass
+class Session:
+    """State of one client, the generator is shared by every session and only read."""
+    generator: ArtifactGenerator
+    rng: random.Random
+    domain: Domain = None
+    artifacts: list[Artifact] = field(default_factory=list)
+
+    def choose_domain(self, number: int) -> str:
+        if number < 1 or number > len(DOMAINS):
+            raise ValueError('Wrong number.')
+        self.domain = self.generator.get_domain(number - 1)
+        return self.roll()
+
+    def roll(self) -> str:
+        if self.domain is None:
+            raise ValueError('Choose a domain first.')
+        self.artifacts = self.generator.grand_roll(self.domain.id, self.rng)
+        return self.list_artifacts()
+
+    def list_artifacts(self) -> str:
+        return '\n'.join(f'{i + 1}. {artifact.format_short()}' for i, artifact in enumerate(self.artifacts))
+
+    def show(self, number: int) -> str:
+        return self.get_artifact(number).format()
+
+    def upgrade(self, number: int, level: int = None) -> str:
+        artifact = self.get_artifact(number)
+        if artifact.level >= artifact.rarity * 4:
+            return 'Max Level Reached'
+        if level is None:
+            artifact.upgrade(self.rng)
+        else:
+            artifact.upgrade_to(level, self.rng)
+        return artifact.format()
+
+    def set_info(self, number: int) -> str:
+        return self.get_artifact(number).set.format_info()
+
+    def get_artifact(self, number: int) -> Artifact:
+        if number < 1 or number > len(self.artifacts):
+            raise ValueError('Wrong number.')
+        return self.artifacts[number - 1]
+
+
+@dataclass
+class SessionServer:
+    """Line based TCP service around one preloaded ArtifactGenerator.
+
+    Every request is one command line (see HELP), every response is an 'OK' or 'ERR <message>'
+    line, the response lines, and a line holding a single '.'. Rolls and upgrades run in a
+    thread pool so a slow one doesn't hold up the event loop.
+    """
+    host: str = HOST
+    port: int = PORT
+    data_dir: str = DATA_DIR
+    workers: int = 4
+    seed: int = None
+    generator: ArtifactGenerator = field(default=None, repr=False)
+    sessions: int = field(default=0, init=False)
+    _executor: ThreadPoolExecutor = field(default=None, init=False, repr=False)
+    _server: asyncio.AbstractServer = field(default=None, init=False, repr=False)
+    _seeds: random.Random = field(default=None, init=False, repr=False)
+
+    async def start(self) -> 'SessionServer':
+        if self.generator is None:
+            self.generator = ArtifactGenerator(self.data_dir)
+        self.generator.preload()
+        self._seeds = random.Random(self.seed)
+        self._executor = ThreadPoolExecutor(self.workers)
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._executor.shutdown()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        session = Session(self.generator, random.Random(self._seeds.getrandbits(64)))
+        try:
+            while True:
+                line = await read_line(reader)
+                if not line:
+                    break
+                command, *args = line.decode(errors='replace').split() or ['']
+                if command == 'quit':
+                    break
+                try:
+                    response = 'OK\n' + await self.execute(session, command, args)
+                except ValueError as error:
+                    response = f'ERR {error}'
+                writer.write(f'{response}\n{END_OF_RESPONSE}\n'.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def execute(self, session: Session, command: str, args: list[str]) -> str:
+        numbers = [parse_number(arg) for arg in args]
+        if command == 'help':
+            return HELP
+        if command == 'domains':
+            return '\n'.join(f'{i + 1}. {domain}' for i, domain in enumerate(DOMAINS))
+        if command == 'list':
+            return session.list_artifacts()
+        if command == 'show' and len(numbers) == 1:
+            return session.show(*numbers)
+        if command == 'set' and len(numbers) == 1:
+            return session.set_info(*numbers)
+        if command == 'domain' and len(numbers) == 1:
+            return await self.offload(session.choose_domain, *numbers)
+        if command == 'roll' and not numbers:
+            return await self.offload(session.roll)
+        if command == 'upgrade' and len(numbers) in (1, 2):
+            return await self.offload(session.upgrade, *numbers)
+        raise ValueError('Wrong command.')
+
+    async def offload(self, function, *args) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    """Next line, or b'' once the client is gone; a line over the stream limit is skipped and read as a blank one."""
+    skipped = False
+    while True:
+        try:
+            line = await reader.readuntil(b'\n')
+            return b'\n' if skipped else line
+        except asyncio.IncompleteReadError as error:
+            return b'' if skipped else error.partial
+        except asyncio.LimitOverrunError as error:
+            await reader.readexactly(error.consumed)
+            skipped = True
+
+
+def parse_number(text: str) -> int:
+    if not text.isdigit():
+        raise ValueError('Wrong number.')
+    return int(text)
+
+
+async def serve(host: str = HOST, port: int = PORT, data_dir: str = DATA_DIR, workers: int = 4):
+    server = await SessionServer(host, port, data_dir, workers).start()
+    print(f'Serving on {server.host}:{server.port}')
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Artifact simulator session server.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.data_dir, args.workers))
+
+
+if __name__ == '__main__':
+    main()
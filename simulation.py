@@ -0,0 +1,160 @@
+import pickle
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, Union
+import numpy as np
+from artifact_generator import ArtifactGenerator, DATA_DIR
+from datatypes import Artifact
+from files import atomic_write
+
+CHECKPOINT_VERSION = 1
+
+_worker_generator: ArtifactGenerator = None
+
+
+@dataclass
+class FarmingResult:
+    """Aggregates of finished farming runs, merging partial results gives the same counts in any order."""
+    runs: int = 0
+    artifacts: Counter = field(default_factory=Counter)
+    sub_stat_values: Counter = field(default_factory=Counter)
+    best_crit_values: Counter = field(default_factory=Counter)
+
+    def add_run(self, artifacts: list[Artifact]):
+        self.runs += 1
+        best_crit_value = 0.0
+        for artifact in artifacts:
+            self.artifacts[artifact.rarity, artifact.type.name, artifact.main_stat.name] += 1
+            for stat in artifact.sub_stats:
+                self.sub_stat_values[artifact.rarity, stat.name, round(stat.value, 2)] += 1
+            if artifact.rarity == 5:
+                best_crit_value = max(best_crit_value, get_crit_value(artifact))
+        self.best_crit_values[best_crit_value] += 1
+
+    def merge(self, other: 'FarmingResult'):
+        self.runs += other.runs
+        self.artifacts.update(other.artifacts)
+        self.sub_stat_values.update(other.sub_stat_values)
+        self.best_crit_values.update(other.best_crit_values)
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a FarmingSimulation: the first completed chunks and their merged result.
+
+    Runs are seeded from (entropy, run index) alone, so entropy and the number of completed
+    chunks are the whole random state.
+    """
+    entropy: int
+    config: tuple
+    completed: int = 0
+    result: FarmingResult = field(default_factory=FarmingResult)
+
+
+@dataclass
+class FarmingSimulation:
+    """Farms a domain domain_rolls times per run and upgrades every artifact to max level.
+
+    Every run draws from its own stream seeded by (seed, run index), and runs are split
+    into chunks of chunk_size independently of workers, so results only depend on seed.
+    With checkpoint_path, progress is saved every checkpoint_interval seconds and at the end,
+    and run() resumes from the saved checkpoint with the same result as an uninterrupted run.
+    """
+    domain: Union[str, int]
+    runs: int
+    domain_rolls: int = 1
+    seed: int = None
+    workers: int = 1
+    chunk_size: int = 100
+    data_dir: str = DATA_DIR
+    checkpoint_path: str = None
+    checkpoint_interval: float = 60.0
+
+    def run(self) -> FarmingResult:
+        config = (self.domain, self.runs, self.domain_rolls, self.chunk_size)
+        checkpoint = read_checkpoint(self.checkpoint_path) if self.checkpoint_path else None
+        if checkpoint is None:
+            checkpoint = Checkpoint(np.random.SeedSequence(self.seed).entropy, config)
+        elif checkpoint.config != config or self.seed is not None and checkpoint.entropy != self.seed:
+            raise ValueError(f'Checkpoint {self.checkpoint_path} belongs to another simulation.')
+
+        chunks = [(self.domain, self.domain_rolls, checkpoint.entropy, start, min(start + self.chunk_size, self.runs))
+                  for start in range(0, self.runs, self.chunk_size)]
+        saved_at = time.monotonic()
+        for chunk_result in self.__simulate(chunks[checkpoint.completed:]):
+            checkpoint.result.merge(chunk_result)
+            checkpoint.completed += 1
+            if self.checkpoint_path and time.monotonic() - saved_at >= self.checkpoint_interval:
+                write_checkpoint(self.checkpoint_path, checkpoint)
+                saved_at = time.monotonic()
+        if self.checkpoint_path:
+            write_checkpoint(self.checkpoint_path, checkpoint)
+        return checkpoint.result
+
+    def __simulate(self, chunks: list[tuple]) -> Iterator[FarmingResult]:
+        """Chunk results in chunk order."""
+        if self.workers == 1:
+            generator = ArtifactGenerator(self.data_dir)
+            for chunk in chunks:
+                yield simulate_runs(generator, *chunk)
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.data_dir,)) as executor:
+                yield from executor.map(simulate_chunk, chunks)
+
+
+def read_checkpoint(path: str):
+    try:
+        with open(path, 'rb') as file:
+            version, checkpoint = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f'Checkpoint {path} has unsupported version {version}.')
+    return checkpoint
+
+
+def write_checkpoint(path: str, checkpoint: Checkpoint):
+    with atomic_write(path, 'wb') as file:
+        pickle.dump((CHECKPOINT_VERSION, checkpoint), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def init_worker(data_dir: str):
+    global _worker_generator
+    _worker_generator = ArtifactGenerator(data_dir)
+
+
+def simulate_chunk(chunk: tuple) -> FarmingResult:
+    return simulate_runs(_worker_generator, *chunk)
+
+
+def simulate_runs(generator: ArtifactGenerator, domain: Union[str, int], domain_rolls: int,
+                  entropy: int, start: int, stop: int) -> FarmingResult:
+    """Runs start..stop-1, each with its own random.Random."""
+    result = FarmingResult()
+    for run in range(start, stop):
+        rng = random.Random(get_run_seed(entropy, run))
+        artifacts = []
+        for _ in range(domain_rolls):
+            for artifact in generator.grand_roll(domain, rng):
+                artifact.upgrade_to_max(rng)
+                artifacts.append(artifact)
+        result.add_run(artifacts)
+    return result
+
+
+def get_run_seed(entropy: int, run: int) -> int:
+    state = np.random.SeedSequence(entropy, spawn_key=(run,)).generate_state(2, np.uint64)
+    return int(state[0]) << 64 | int(state[1])
+
+
+def get_crit_value(artifact: Artifact) -> float:
+    crit_value = 0.0
+    for stat in artifact.sub_stats:
+        if stat.name == 'CRIT Rate (%)':
+            crit_value += 2 * stat.value
+        elif stat.name == 'CRIT DMG (%)':
+            crit_value += stat.value
+    return round(crit_value, 1)
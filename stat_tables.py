@@ -0,0 +1,40 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAIN_STAT_LEVELS = 21
+
+
+@lru_cache(maxsize=None)
+def get_main_stat_values(stat_min: float, stat_max: float) -> tuple[float, ...]:
+    return tuple(round(stat_min + (stat_max - stat_min) / 20 * i, 1) for i in range(MAIN_STAT_LEVELS))
+
+
+@dataclass(frozen=True)
+class MainStatTable:
+    """Main stat values by (rarity, stat name), one value per level."""
+    values: dict[tuple[int, str], tuple[float, ...]]
+
+    @classmethod
+    def from_stats(cls, stats: dict) -> 'MainStatTable':
+        values = {}
+        for rarity in stats:
+            for artifact_type in stats[rarity]:
+                for stat in stats[rarity][artifact_type]:
+                    values[int(rarity), stat['name']] = get_main_stat_values(stat['min'], stat['max'])
+        return cls(values)
+
+    def as_array(self, names: list[str]) -> np.ndarray:
+        """Values indexed by [rarity - 1, index of the stat in names, level], NaN where a rarity lacks a stat."""
+        import numpy as np
+        rarities = max(rarity for rarity, _ in self.values)
+        array = np.full((rarities, len(names), MAIN_STAT_LEVELS), np.nan)
+        for (rarity, name), values in self.values.items():
+            array[rarity - 1, names.index(name)] = values
+        array.flags.writeable = False
+        return array
+
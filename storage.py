@@ -0,0 +1,114 @@
+import json
+import os
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Iterator
+import numpy as np
+from batch import ArtifactBatch
+from files import atomic_write
+
+MANIFEST_FILE = 'manifest.json'
+STORAGE_VERSION = 1
+
+
+@dataclass
+class ArtifactStoreWriter:
+    """Writes ArtifactBatch rows as shard directories holding one .npy file per column.
+
+    Rows are buffered until shard_size is reached; the manifest is replaced atomically
+    after every shard, so readers only ever see complete shards.
+    """
+    path: str
+    shard_size: int = 1_000_000
+    _buffer: list[ArtifactBatch] = field(default_factory=list, init=False, repr=False)
+    _buffered_rows: int = field(default=0, init=False, repr=False)
+    _manifest: dict = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        os.makedirs(self.path, exist_ok=True)
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as file:
+                self._manifest = json.load(file)
+        else:
+            self._manifest = {'version': STORAGE_VERSION, 'columns': {}, 'shards': []}
+
+    def __enter__(self) -> 'ArtifactStoreWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, batch: ArtifactBatch):
+        if not len(batch):
+            return
+        self._buffer.append(batch)
+        self._buffered_rows += len(batch)
+        if self._buffered_rows >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        batch = ArtifactBatch.concatenate(self._buffer)
+        self._buffer, self._buffered_rows = [], 0
+
+        name = f'{len(self._manifest["shards"]):05d}'
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+        for column in fields(batch):
+            values = np.ascontiguousarray(getattr(batch, column.name))
+            np.save(os.path.join(self.path, name, f'{column.name}.npy'), values)
+            self._manifest['columns'][column.name] = {'dtype': values.dtype.str, 'shape': list(values.shape[1:])}
+        self._manifest['shards'].append({'name': name, 'rows': len(batch)})
+        self.__write_manifest()
+
+    def close(self):
+        self.flush()
+
+    def __write_manifest(self):
+        with atomic_write(os.path.join(self.path, MANIFEST_FILE)) as file:
+            json.dump(self._manifest, file)
+
+
+@dataclass
+class ArtifactStore:
+    """Reads shards written by ArtifactStoreWriter as memory-mapped ArtifactBatch views."""
+    path: str
+    manifest: dict = field(init=False, repr=False)
+
+    def __post_init__(self):
+        with open(os.path.join(self.path, MANIFEST_FILE), 'r') as file:
+            self.manifest = json.load(file)
+        if self.manifest['version'] != STORAGE_VERSION:
+            raise ValueError(f'Unsupported storage version {self.manifest["version"]}.')
+
+    def __len__(self) -> int:
+        return sum(shard['rows'] for shard in self.manifest['shards'])
+
+    @property
+    def n_shards(self) -> int:
+        return len(self.manifest['shards'])
+
+    def read_shard(self, index: int) -> ArtifactBatch:
+        """Columns are read-only np.memmap arrays, nothing is loaded until it is touched."""
+        name = self.manifest['shards'][index]['name']
+        return ArtifactBatch(**{column.name: self.read_column(name, column.name) for column in fields(ArtifactBatch)})
+
+    def read_column(self, shard_name: str, column: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, shard_name, f'{column}.npy'), mmap_mode='r')
+
+    def scan(self, columns: Iterable[str] = None) -> Iterator[dict[str, np.ndarray]]:
+        """Memory-mapped columns of every shard, only the requested ones."""
+        columns = list(self.manifest['columns']) if columns is None else list(columns)
+        for shard in self.manifest['shards']:
+            yield {column: self.read_column(shard['name'], column) for column in columns}
+
+    def __iter__(self) -> Iterator[ArtifactBatch]:
+        for index in range(self.n_shards):
+            yield self.read_shard(index)
+
+
+def write_batches(batches: Iterable[ArtifactBatch], path: str, shard_size: int = 1_000_000) -> ArtifactStore:
+    with ArtifactStoreWriter(path, shard_size) as writer:
+        for batch in batches:
+            writer.write(batch)
+    return ArtifactStore(path)
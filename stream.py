@@ -0,0 +1,84 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, TypeVar, Union
+import numpy as np
+from artifact_generator import ArtifactGenerator
+from batch import ArtifactBatch
+from datatypes import Artifact
+
+T = TypeVar('T')
+
+_END = object()
+
+
+def upgrade_batches(batches: Iterable[ArtifactBatch], generator: ArtifactGenerator, level: int = None,
+                    seed: Union[int, np.random.Generator] = None) -> Iterator[ArtifactBatch]:
+    rng = np.random.default_rng(seed)
+    for batch in batches:
+        yield generator.upgrade_batch(batch, level, rng)
+
+
+def filter_batches(batches: Iterable[ArtifactBatch],
+                   predicate: Callable[[ArtifactBatch], np.ndarray]) -> Iterator[ArtifactBatch]:
+    """Keeps the rows where predicate(batch) is True, skipping chunks left empty."""
+    for batch in batches:
+        selected = batch.select(predicate(batch))
+        if len(selected):
+            yield selected
+
+
+def take_runs(batches: Iterable[ArtifactBatch], n_runs: int) -> Iterator[ArtifactBatch]:
+    """Stops the stream after the first n_runs domain runs."""
+    for batch in batches:
+        if len(batch) and batch.run[0] >= n_runs:
+            return
+        yield batch.select(batch.run < n_runs)
+
+
+def expand_batches(batches: Iterable[ArtifactBatch], generator: ArtifactGenerator) -> Iterator[list[Artifact]]:
+    for batch in batches:
+        yield generator.expand_batch(batch)
+
+
+def aggregate(items: Iterable[T], function: Callable, initial):
+    """Folds a stream into one value: initial = function(initial, item) for every item."""
+    for item in items:
+        initial = function(initial, item)
+    return initial
+
+
+def prefetch(items: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """Produces up to depth items ahead in a background thread, blocking it while the queue is full."""
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((_END, None))
+        except BaseException as error:
+            put((_END, error))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,102 @@
+import math
+import os
+import random
+from collections import Counter
+from itertools import accumulate
+import pytest
+from artifact_generator import ARTIFACT_TYPE_NAMES, ArtifactGenerator
+from datatypes import ArtifactType
+from samplers import AliasTable
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DRAWS = 100_000
+SIGNIFICANCE_Z = 3.719  # one-sided normal quantile of 1e-4
+
+
+@pytest.fixture(scope='module')
+def generator() -> ArtifactGenerator:
+    return ArtifactGenerator(DATA_DIR, use_cache=False)
+
+
+def choices_main_stat(artifact_type: ArtifactType, rng: random.Random) -> str:
+    """The random.choices sampler the alias tables replaced."""
+    return rng.choices(artifact_type.main_stats, weights=artifact_type.main_probabilities, k=1)[0].name
+
+
+def choices_sub_stats(artifact_type: ArtifactType, number_of_stats: int, main_stat_name: str,
+                      excluded: tuple[str, ...], rng: random.Random) -> tuple[str, ...]:
+    """The random.choices sampler the alias tables replaced, renormalizing after every draw."""
+    available = [stat for stat in artifact_type.sub_stats if stat.name != main_stat_name and stat.name not in excluded]
+    names = []
+    for _ in range(number_of_stats):
+        cum_weights = list(accumulate(stat.probability for stat in available))
+        stat = rng.choices(available, cum_weights=cum_weights, k=1)[0]
+        available.remove(stat)
+        names.append(stat.name)
+    return tuple(names)
+
+
+def chi_square_homogeneity(first: Counter, second: Counter) -> tuple[float, int]:
+    """Chi-square statistic and degrees of freedom of two samples coming from one distribution."""
+    total_first, total_second = sum(first.values()), sum(second.values())
+    statistic = 0.0
+    for key in first.keys() | second.keys():
+        observed = first[key] + second[key]
+        expected_first = observed * total_first / (total_first + total_second)
+        expected_second = observed * total_second / (total_first + total_second)
+        statistic += (first[key] - expected_first) ** 2 / expected_first
+        statistic += (second[key] - expected_second) ** 2 / expected_second
+    return statistic, len(first.keys() | second.keys()) - 1
+
+
+def chi_square_critical(degrees_of_freedom: int) -> float:
+    """Wilson-Hilferty approximation of the chi-square quantile at SIGNIFICANCE_Z."""
+    k = 2 / (9 * degrees_of_freedom)
+    return degrees_of_freedom * (1 - k + SIGNIFICANCE_Z * math.sqrt(k)) ** 3
+
+
+def assert_same_distribution(first: Counter, second: Counter):
+    statistic, degrees_of_freedom = chi_square_homogeneity(first, second)
+    assert statistic < chi_square_critical(degrees_of_freedom), (statistic, degrees_of_freedom)
+
+
+def get_alias_probabilities(table: AliasTable) -> list[float]:
+    n = len(table.items)
+    probabilities = [p / n for p in table.probabilities]
+    for i, alias in enumerate(table.aliases):
+        probabilities[alias] += (1 - table.probabilities[i]) / n
+    return probabilities
+
+
+@pytest.mark.parametrize('weights', [[1.0], [0.5, 0.5], [0.2668, 0.2668, 0.2668, 0.1, 0.1],
+                                     [0.2125, 0.2125, 0.2] + [0.05] * 7 + [0.025], [3, 0, 1]])
+def test_alias_table_probabilities_match_weights(weights):
+    table = AliasTable.from_weights(range(len(weights)), weights)
+    assert get_alias_probabilities(table) == pytest.approx([weight / sum(weights) for weight in weights])
+
+
+@pytest.mark.parametrize('rarity', [3, 4, 5])
+@pytest.mark.parametrize('type_name', ARTIFACT_TYPE_NAMES[2:])
+def test_main_stats_match_choices(generator, rarity, type_name):
+    artifact_type = generator.get_artifact_types(rarity)[ARTIFACT_TYPE_NAMES.index(type_name)]
+    alias_rng, choices_rng = random.Random(1), random.Random(2)
+    alias = Counter(artifact_type.get_random_main_stat(alias_rng).name for _ in range(DRAWS))
+    choices = Counter(choices_main_stat(artifact_type, choices_rng) for _ in range(DRAWS))
+    assert_same_distribution(alias, choices)
+
+
+@pytest.mark.parametrize('type_name, number_of_stats, main_stat_name, excluded', [
+    ('Flower of Life', 4, 'HP', ()),
+    ('Circlet of Logos', 2, 'CRIT Rate (%)', ()),
+    ('Goblet of Eonothem', 2, 'ATK (%)', ('CRIT Rate (%)',)),
+    ('Goblet of Eonothem', 1, 'Elemental DMG Bonus (%)', ('CRIT Rate (%)', 'CRIT DMG (%)', 'ATK (%)')),
+    ('Sands of Eon', 2, 'Energy Recharge (%)', ('HP', 'DEF')),
+])
+def test_sub_stats_match_choices(generator, type_name, number_of_stats, main_stat_name, excluded):
+    artifact_type = generator.get_artifact_types(5)[ARTIFACT_TYPE_NAMES.index(type_name)]
+    alias_rng, choices_rng = random.Random(3), random.Random(4)
+    alias = Counter(tuple(stat.name for stat in artifact_type.get_random_sub_stats(
+        number_of_stats, main_stat_name, excluded, rng=alias_rng)) for _ in range(DRAWS))
+    choices = Counter(choices_sub_stats(artifact_type, number_of_stats, main_stat_name, excluded, choices_rng)
+                      for _ in range(DRAWS))
+    assert_same_distribution(alias, choices)
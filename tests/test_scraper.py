@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+import pytest
+from bs4 import BeautifulSoup
+import artifact_parser
+import data_files
+import stats_parser
+from artifact_parser import get_sets_links, parse_set_page, parse_sets
+from fetcher import Fetcher
+from parsing import parse_fragments
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+WIKI_DIR = os.path.join(FIXTURES_DIR, 'wiki')
+SET_PAGES = ['Gladiators_Finale', 'Noblesse_Oblige']
+PARSERS = ['html.parser', pytest.param('lxml', marks=pytest.mark.skipif(find_spec('lxml') is None,
+                                                                         reason='lxml is not installed'))]
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the saved wiki pages, with Last-Modified revalidation, recording every status code sent."""
+    extensions_map = {'.html': 'text/html; charset=UTF-8'}
+
+    def log_request(self, code='-', size='-'):
+        self.server.statuses.append(int(code))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def wiki(tmp_path):
+    """Base URL of a local stand-in for the wiki, serving a copy of the fixture pages."""
+    root = tmp_path / 'wiki'
+    shutil.copytree(WIKI_DIR, root)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(FixtureHandler, directory=str(root)))
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, root, f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    with Fetcher(cache_dir=str(tmp_path / 'http_cache'), max_workers=4) as fetcher:
+        yield fetcher
+
+
+@pytest.fixture(scope='module')
+def expected() -> dict:
+    with open(os.path.join(FIXTURES_DIR, 'expected.json'), 'r', encoding='UTF-8') as file:
+        return json.load(file)
+
+
+def parse_full_tree(page: str, strainer, parser: str = 'html.parser') -> BeautifulSoup:
+    """The whole page built into an html.parser tree, how pages were parsed before straining."""
+    return BeautifulSoup(page, 'html.parser')
+
+
+def read_page(name: str) -> str:
+    with open(os.path.join(WIKI_DIR, f'{name}.html'), 'r', encoding='UTF-8') as file:
+        return file.read()
+
+
+def get_stats_summary(main_stats: dict, sub_stats: dict) -> dict:
+    """Parsed stats as JSON, sub stats leave out their randomly rolled proc history."""
+    return {'main_stats': {str(rarity): {artifact_type: [[stat.name, stat.min, stat.max] for stat in stats]
+                                         for artifact_type, stats in main_stats[rarity].items()}
+                           for rarity in main_stats},
+            'sub_stats': {str(rarity): [[stat.name, stat.possible_values] for stat in stats]
+                          for rarity, stats in sub_stats.items()}}
+
+
+def test_fetch_revalidates_cached_pages(wiki, fetcher, tmp_path):
+    server, root, base_url = wiki
+    url = f'{base_url}/Gladiators_Finale.html'
+
+    first = fetcher.fetch(url)
+    assert first.changed and first.text == read_page('Gladiators_Finale')
+    second = fetcher.fetch(url)
+    assert not second.changed and second.text == first.text
+    with Fetcher(cache_dir=str(tmp_path / 'http_cache')) as restarted:
+        assert not restarted.fetch(url).changed
+    assert server.statuses == [200, 304, 304]
+
+    path = root / 'Gladiators_Finale.html'
+    path.write_text(first.text.replace('ATK +18%.', 'ATK +20%.'), encoding='UTF-8')
+    modified = os.stat(path).st_mtime + 60
+    os.utime(path, (modified, modified))
+    third = fetcher.fetch(url)
+    assert third.changed and 'ATK +20%.' in third.text
+    assert server.statuses[-1] == 200
+
+
+def test_fetch_all_keeps_order(wiki, fetcher):
+    _, _, base_url = wiki
+    urls = [f'{base_url}/{name}.html' for name in SET_PAGES + ['Artifacts', 'Artifacts_Stats']]
+    pages = fetcher.fetch_all(urls)
+    assert [page.url for page in pages] == urls
+    assert all(page.changed for page in pages)
+
+
+def test_get_sets_links(wiki, fetcher):
+    _, _, base_url = wiki
+    assert get_sets_links(f'{base_url}/Artifacts.html', fetcher) == [
+        'https://genshin-impact.fandom.com/wiki/Gladiator%27s_Finale',
+        'https://genshin-impact.fandom.com/wiki/Noblesse_Oblige']
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+@pytest.mark.parametrize('name', SET_PAGES)
+def test_parse_set_page(expected, name, parser):
+    assert vars(parse_set_page(name, read_page(name), parser)) == expected['sets'][name]
+
+
+@pytest.mark.parametrize('name', SET_PAGES)
+def test_parse_set_page_matches_full_tree(monkeypatch, name):
+    strained = vars(parse_set_page(name, read_page(name)))
+    monkeypatch.setattr(artifact_parser, 'parse_fragments', parse_full_tree)
+    assert vars(parse_set_page(name, read_page(name))) == strained
+
+
+def test_parse_sets_reuses_unchanged_pages(wiki, fetcher, expected, monkeypatch):
+    _, root, base_url = wiki
+    links = [f'{base_url}/{name}.html' for name in SET_PAGES]
+    sets, build = parse_sets(links, fetcher)
+    assert [vars(artifact_set) for artifact_set in sets] == [expected['sets'][name] for name in SET_PAGES]
+
+    changed = root / 'Noblesse_Oblige.html'
+    changed.write_text(read_page('Noblesse_Oblige').replace('Royal Flora', 'Royal Plume'), encoding='UTF-8')
+    modified = os.stat(changed).st_mtime + 60
+    os.utime(changed, (modified, modified))
+    parsed = []
+
+    def recording_parse_set_page(link: str, page: str):
+        parsed.append(link)
+        return parse_set_page(link, page)
+
+    monkeypatch.setattr(artifact_parser, 'parse_set_page', recording_parse_set_page)
+    sets, rebuild = parse_sets(links, fetcher, build)
+    assert parsed == [links[1]]
+    assert rebuild[links[0]] == build[links[0]]
+    assert sets[1].artifact_names == ['Royal Plume']
+
+
+@pytest.mark.parametrize('parser', PARSERS + ['full tree'])
+def test_parse_stats(wiki, fetcher, expected, monkeypatch, parser):
+    server, _, base_url = wiki
+    monkeypatch.setattr(stats_parser, 'SCALING_LINK', f'{base_url}/Artifacts_Scaling.html')
+    if parser == 'full tree':
+        monkeypatch.setattr(stats_parser, 'parse_fragments', parse_full_tree)
+    else:
+        monkeypatch.setattr(stats_parser, 'parse_fragments', partial(parse_fragments, parser=parser))
+    main_stats, sub_stats = stats_parser.parse_stats(f'{base_url}/Artifacts_Stats.html', fetcher)
+    assert get_stats_summary(main_stats, sub_stats) == expected['stats']
+    assert sorted(server.statuses) == [200, 200]
+
+
+def test_refreshing_unchanged_stats_keeps_files(wiki, fetcher, monkeypatch, tmp_path):
+    _, _, base_url = wiki
+    monkeypatch.setattr(stats_parser, 'SCALING_LINK', f'{base_url}/Artifacts_Scaling.html')
+    monkeypatch.setattr(data_files, 'DATA_DIR', str(tmp_path))
+    written = []
+    for _ in range(2):
+        main_stats, sub_stats = stats_parser.parse_stats(f'{base_url}/Artifacts_Stats.html', fetcher)
+        stats_parser.append_main_stats_probabilities(main_stats)
+        stats_parser.append_sub_stats_probabilities(sub_stats)
+        written.append([stats_parser.save_main_stats_to_json(main_stats, 'main_stats'),
+                        stats_parser.save_sub_stats_to_json(sub_stats, 'sub_stats')])
+    assert written == [[True, True], [False, False]]
+    with open(tmp_path / 'sub_stats.json', 'r', encoding='UTF-8') as file:
+        assert all('proc_history' not in stat for stats in json.load(file).values() for stat in stats)
@@ -0,0 +1,107 @@
+from functools import lru_cache
+from typing import Iterable
+from datatypes import Artifact
+
+ROUNDING = 6
+
+Distribution = dict[float, float]
+
+
+def get_score_distribution(artifact: Artifact, weights: dict[str, float]) -> Distribution:
+    """Exact distribution of sum(weight * sub stat value) once the artifact is upgraded to max level.
+
+    Sub stats missing from weights count as 0. Every sub stat upgrade picks one of the four
+    sub stats uniformly and one of its possible values uniformly, so the upgrades after the
+    fourth sub stat is added are i.i.d. and their total is a convolution power.
+    """
+    events = artifact.rarity - artifact.level // 4
+    present_score = sum(weights.get(stat.name, 0.0) * stat.value for stat in artifact.sub_stats)
+    templates = {stat.name: stat for stat in artifact.type.sub_stats}
+
+    distribution = {}
+    for added, probability in get_added_sub_stats(artifact, min(events, 4 - len(artifact.sub_stats))):
+        score = {round(present_score, ROUNDING): 1.0}
+        for name in added:
+            score = convolve(score, get_roll_distribution(weights.get(name, 0.0), tuple(templates[name].possible_values)))
+
+        upgrades = events - len(added)
+        if upgrades:
+            names = [stat.name for stat in artifact.sub_stats] + list(added)
+            upgrade = mix(get_roll_distribution(weights.get(name, 0.0), tuple(templates[name].possible_values))
+                          for name in names)
+            score = convolve(score, power(upgrade, upgrades))
+
+        for value, value_probability in score.items():
+            distribution[value] = distribution.get(value, 0.0) + probability * value_probability
+    return dict(sorted(distribution.items()))
+
+
+def get_sub_stat_distributions(artifact: Artifact) -> dict[str, Distribution]:
+    """Exact distribution of every sub stat's value at max level, 0 when the artifact doesn't get it."""
+    names = [stat.name for stat in artifact.sub_stats]
+    events = artifact.rarity - artifact.level // 4
+    if len(names) < 4 and events:
+        names += [stat.name for stat in artifact.type.sub_stats
+                  if stat.name not in names and stat.name != artifact.main_stat.name]
+    return {name: get_score_distribution(artifact, {name: 1.0}) for name in names}
+
+
+def get_added_sub_stats(artifact: Artifact, number_of_stats: int) -> list[tuple[tuple[str, ...], float]]:
+    """Sub stats the next upgrades add, drawn without replacement by probability, with their chances."""
+    present = {stat.name for stat in artifact.sub_stats}
+    stats = [stat for stat in artifact.type.sub_stats
+             if stat.name != artifact.main_stat.name and stat.name not in present]
+
+    states = {(): 1.0}
+    for _ in range(number_of_stats):
+        next_states = {}
+        for added, probability in states.items():
+            available = [stat for stat in stats if stat.name not in added]
+            total = sum(stat.probability for stat in available)
+            for stat in available:
+                key = tuple(sorted(added + (stat.name,)))
+                next_states[key] = next_states.get(key, 0.0) + probability * stat.probability / total
+        states = next_states
+    return list(states.items())
+
+
+@lru_cache(maxsize=None)
+def get_roll_distribution(weight: float, possible_values: tuple[float, ...]) -> Distribution:
+    distribution = {}
+    for value in possible_values:
+        key = round(weight * value, ROUNDING)
+        distribution[key] = distribution.get(key, 0.0) + 1 / len(possible_values)
+    return distribution
+
+
+def convolve(first: Distribution, second: Distribution) -> Distribution:
+    distribution = {}
+    for first_value, first_probability in first.items():
+        for second_value, second_probability in second.items():
+            key = round(first_value + second_value, ROUNDING)
+            distribution[key] = distribution.get(key, 0.0) + first_probability * second_probability
+    return distribution
+
+
+def power(distribution: Distribution, n: int) -> Distribution:
+    result = {0.0: 1.0}
+    for _ in range(n):
+        result = convolve(result, distribution)
+    return result
+
+
+def mix(distributions: Iterable[Distribution]) -> Distribution:
+    distributions = list(distributions)
+    mixture = {}
+    for distribution in distributions:
+        for value, probability in distribution.items():
+            mixture[value] = mixture.get(value, 0.0) + probability / len(distributions)
+    return mixture
+
+
+def get_probability_at_least(distribution: Distribution, threshold: float) -> float:
+    return sum(probability for value, probability in distribution.items() if value >= threshold)
+
+
+def get_expected_value(distribution: Distribution) -> float:
+    return sum(value * probability for value, probability in distribution.items())